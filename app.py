@@ -1,15 +1,22 @@
-from flask import Flask, render_template, redirect, url_for, flash, request, Response
-from database import db, User, Task
+from flask import Flask, render_template, redirect, url_for, flash, request, Response, g, session
+from database import db, User, Task, TaskDependency, Team, TeamMembership, JobCheckpoint
 from dotenv import load_dotenv
 from os import path, environ
 from flask_mail import Mail
 from flask_login import LoginManager, login_required, logout_user, current_user, login_user
-from forms import LoginForm, RegistrationForm, CreateTaskForm
+from forms import LoginForm, RegistrationForm, CreateTaskForm, ReminderSettingsForm, LogoutAllForm
+from task_graph import graph_cache, task_scope, bump_version, add_dependency, DependencyCycleError
+from permissions import current_memberships, visible_tasks, is_team_owner, can_remove_task
+from sessions import ServerSideSessionInterface, create_session_store
+from reminders import (SLOT_MINUTES, bucket_start, local_date, local_slots, parse_offsets, reminder_text,
+                       slot_for_hour, slot_hour)
 from werkzeug.security import generate_password_hash, check_password_hash
 import csv
 import io
 import smtplib
 import datetime
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
 from apscheduler.schedulers.background import BackgroundScheduler
 
 # Flask App Initialization
@@ -25,6 +32,14 @@ app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path.join(basedir, 'flask
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = environ.get('SECRET_KEY')
 
+# Configure server-side sessions ("sqlite" or "redis")
+app.config['SESSION_BACKEND'] = environ.get('SESSION_BACKEND', 'sqlite')
+app.config['SESSION_SQLITE_PATH'] = path.join(basedir, 'sessions.db')
+app.config['SESSION_REDIS_URL'] = environ.get('SESSION_REDIS_URL')
+
+# Session data is kept server-side, the cookie only holds the session id
+app.session_interface = ServerSideSessionInterface(create_session_store(app.config))
+
 # Initialize database
 db.init_app(app)
 
@@ -97,6 +112,8 @@ def login():
 
         # Verify password hash
         if user and check_password_hash(user.password, password):
+            # New session id on login against session fixation
+            session.regenerate()
             login_user(user)
             flash("Login successful!", 'success')
             return redirect(url_for('dashboard'))
@@ -116,12 +133,27 @@ def logout():
     flash("You have been logged out successfully!", 'success')
     return redirect(url_for('home'))
 
+# Logout everywhere route
+@app.route('/logout_all', methods=['POST'])
+@login_required
+def logout_all():
+    """Revoke all of the user's sessions on every device and log out"""
+    # POST with a CSRF token so another site cannot log the user out
+    if not LogoutAllForm().validate_on_submit():
+        flash("Invalid request, please try again", 'error')
+        return redirect(url_for('settings'))
+
+    app.session_interface.store.revoke_user(current_user.id)
+    logout_user()
+    flash("You have been logged out on all devices!", 'success')
+    return redirect(url_for('home'))
+
 # Dashboard route
 @app.route('/dashboard', methods=['GET'])
 @login_required
 def dashboard():
     """
-    Dashboard route - displays user's tasks with filtering.
+    Dashboard route - displays user's personal and shared tasks with filtering.
 
     Supports filtering by:
     - Status (To Do, In Progress, Completed)
@@ -132,15 +164,19 @@ def dashboard():
 
     # Build query based on filters
     if selected_status:
-        tasks = Task.query.filter_by(user_id=current_user.id,
-                                     status=selected_status).all()
+        tasks = visible_tasks().filter_by(status=selected_status).all()
     elif selected_priority:
-        tasks = Task.query.filter_by(user_id=current_user.id,
-                                     priority=selected_priority).all()
+        tasks = visible_tasks().filter_by(priority=selected_priority).all()
     else:
-        tasks = Task.query.filter_by(user_id=current_user.id).all()
+        tasks = visible_tasks().all()
+
+    team_names = {team_id: name for team_id, (name, _) in current_memberships().items()}
 
-    return render_template("dashboard.html", tasks=tasks)
+    return render_template("dashboard.html", tasks=tasks, team_names=team_names)
+
+def list_choices():
+    """Choices for the task list field: personal list plus the user's teams"""
+    return [(0, 'Personal')] + [(team_id, name) for team_id, (name, _) in current_memberships().items()]
 
 # Create task route
 @app.route('/create_task', methods=['GET', 'POST'])
@@ -153,6 +189,7 @@ def create_task():
     POST: Create task associated with current user
     """
     create_task_form = CreateTaskForm()
+    create_task_form.team_id.choices = list_choices()
 
     if create_task_form.validate_on_submit():
         title = create_task_form.title.data
@@ -160,13 +197,16 @@ def create_task():
         due_date = create_task_form.due_date.data
         status = create_task_form.status.data
         priority = create_task_form.priority.data
+        team_id = create_task_form.team_id.data or None
         user_id = current_user.id
 
         # Create new task
         new_task = Task(title=title, description=description, due_date=due_date,
-                       status=status, user_id=user_id, priority=priority)
+                       status=status, user_id=user_id, priority=priority, team_id=team_id)
         db.session.add(new_task)
+        version = bump_version(task_scope(new_task))
         db.session.commit()
+        graph_cache.task_saved(new_task, version)
 
         return redirect(url_for('dashboard'))
 
@@ -181,16 +221,164 @@ def api_delete_task(task_id):
 
     Returns JSON response with status
     """
-    task = Task.query.filter_by(id=task_id, user_id=current_user.id).first()
+    task = visible_tasks().filter_by(id=task_id).first()
 
     if not task:
         return {'error': 'Task not found'}, 404
 
+    if not can_remove_task(task):
+        return {'error': 'Only the task creator or a team owner can delete it'}, 403
+
+    scope = task_scope(task)
+    version = bump_version(scope)
+
+    # Remove dependency edges in both directions
+    TaskDependency.query.filter(
+        (TaskDependency.task_id == task_id) | (TaskDependency.blocked_by_id == task_id)
+    ).delete(synchronize_session=False)
     db.session.delete(task)
     db.session.commit()
+    graph_cache.task_deleted(scope, version, task_id)
 
     return {'message': 'Task deleted successfully'}, 200
 
+# Add task dependency route
+@app.route('/api/tasks/<int:task_id>/dependencies', methods=['POST'])
+@login_required
+def api_add_dependency(task_id):
+    """
+    Mark a task as blocked by another task.
+
+    Expects JSON body: {"blocked_by_id": <task id>}
+    Returns 400 if the dependency would create a cycle
+    """
+    data = request.get_json(silent=True) or {}
+    blocked_by_id = data.get('blocked_by_id')
+
+    # bool is a subclass of int, but JSON true/false is not a task id
+    if type(blocked_by_id) is not int:
+        return {'error': 'blocked_by_id is required'}, 400
+
+    # Both tasks must be visible to the current user and on the same list
+    tasks = visible_tasks().filter(Task.id.in_([task_id, blocked_by_id])).all()
+    if len(tasks) != len({task_id, blocked_by_id}):
+        return {'error': 'Task not found'}, 404
+
+    scope = task_scope(tasks[0])
+    if any(task_scope(task) != scope for task in tasks):
+        return {'error': 'Tasks must be on the same list'}, 400
+
+    # Cycle check runs in SQL inside the insert transaction, not on the
+    # cached graph, which may miss edges added by another worker
+    try:
+        added = add_dependency(scope, task_id, blocked_by_id)
+    except DependencyCycleError:
+        return {'error': 'Dependency would create a cycle'}, 400
+    if not added:
+        return {'message': 'Dependency already exists'}, 200
+
+    return {'message': 'Dependency added successfully'}, 201
+
+# Remove task dependency route
+@app.route('/api/tasks/<int:task_id>/dependencies/<int:blocked_by_id>', methods=['DELETE'])
+@login_required
+def api_remove_dependency(task_id, blocked_by_id):
+    """
+    Remove a blocked-by dependency between two tasks.
+
+    Returns JSON response with status
+    """
+    task = visible_tasks().filter_by(id=task_id).first()
+    dependency = TaskDependency.query.filter_by(task_id=task_id,
+                                                blocked_by_id=blocked_by_id).first()
+
+    if not task or not dependency:
+        return {'error': 'Dependency not found'}, 404
+
+    scope = task_scope(task)
+    version = bump_version(scope)
+    db.session.delete(dependency)
+    db.session.commit()
+    graph_cache.dependency_removed(scope, version, task_id, blocked_by_id)
+
+    return {'message': 'Dependency removed successfully'}, 200
+
+def requested_scope():
+    """
+    Graph scope for the graph endpoints.
+
+    Uses the team list from the `team_id` query parameter if given,
+    otherwise the user's personal list. Returns None for teams the user
+    is not a member of.
+    """
+    team_id = request.args.get('team_id', type=int)
+    if team_id is None:
+        return ('user', current_user.id)
+    if team_id not in current_memberships():
+        return None
+    return ('team', team_id)
+
+# Topological order route
+@app.route('/api/tasks/order', methods=['GET'])
+@login_required
+def api_task_order():
+    """
+    Return the task ids of a list in dependency order.
+
+    Every task comes after all tasks blocking it; ready tasks are ordered
+    by due date. Pass ?team_id=<id> for a shared list.
+    """
+    scope = requested_scope()
+    if scope is None:
+        return {'error': 'Team not found'}, 404
+
+    graph = graph_cache.get(scope)
+    return {'order': graph.topological_order()}, 200
+
+# Critical path route
+@app.route('/api/tasks/critical_path', methods=['GET'])
+@login_required
+def api_critical_path():
+    """
+    Return the chain of dependent tasks that sets a list's latest finish.
+
+    Each entry's `slack_days` is the number of days between its due date
+    and that of the task it blocks on the path (None for the last task).
+    Pass ?team_id=<id> for a shared list.
+    """
+    scope = requested_scope()
+    if scope is None:
+        return {'error': 'Team not found'}, 404
+
+    path = graph_cache.get(scope).critical_path()
+
+    tasks = {task.id: task for task in Task.query.filter(Task.id.in_(path))}
+    due_dates = [tasks[task_id].due_date for task_id in path]
+    slack = [(after - before).days for before, after in zip(due_dates, due_dates[1:])] + [None]
+    return {'critical_path': [{'id': task_id,
+                               'title': tasks[task_id].title,
+                               'due_date': tasks[task_id].due_date.isoformat(),
+                               'status': tasks[task_id].status,
+                               'slack_days': slack_days}
+                              for task_id, slack_days in zip(path, slack)]}, 200
+
+# Blocked status route
+@app.route('/api/tasks/blocked', methods=['GET'])
+@login_required
+def api_blocked_tasks():
+    """
+    Split the task ids of a list into blocked and unblocked.
+
+    A task is blocked while any task blocking it is not completed. Pass
+    ?team_id=<id> for a shared list.
+    """
+    scope = requested_scope()
+    if scope is None:
+        return {'error': 'Team not found'}, 404
+
+    blocked, unblocked = graph_cache.get(scope).blocked_status()
+    return {'blocked': blocked, 'unblocked': unblocked}, 200
+
 # EDIT/UPDATE task route
 @app.route('/tasks/<int:task_id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -201,14 +389,15 @@ def edit_task(task_id):
     GET: Display edit form with existing task data
     POST: Update task in database
     """
-    # Query task and verify ownership
-    task = Task.query.filter_by(id=task_id, user_id=current_user.id).first()
+    # Query task and verify the user can see it
+    task = visible_tasks().filter_by(id=task_id).first()
 
     if not task:
         flash('Task not found', 'error')
         return redirect(url_for('dashboard'))
 
     form = CreateTaskForm()
+    form.team_id.choices = list_choices()
 
     # Pre-populate form with existing data
     if request.method == 'GET':
@@ -217,8 +406,15 @@ def edit_task(task_id):
         form.due_date.data = task.due_date
         form.status.data = task.status
         form.priority.data = task.priority
+        form.team_id.data = task.team_id or 0
 
     if form.validate_on_submit():
+        # Only the creator or a team owner may take a task off a team list
+        team_id = form.team_id.data or None
+        if team_id != task.team_id and not can_remove_task(task):
+            flash('Only the task creator or a team owner can move it to another list', 'error')
+            return redirect(url_for('dashboard'))
+
         # Update task fields
         task.title = form.title.data
         task.description = form.description.data
@@ -226,7 +422,24 @@ def edit_task(task_id):
         task.status = form.status.data
         task.priority = form.priority.data
 
+        # Moving a task to another list drops its dependencies there
+        old_scope = task_scope(task)
+        if team_id != task.team_id:
+            TaskDependency.query.filter(
+                (TaskDependency.task_id == task.id) | (TaskDependency.blocked_by_id == task.id)
+            ).delete(synchronize_session=False)
+            task.team_id = team_id
+            # Personal lists belong to whoever moved the task there
+            if team_id is None:
+                task.user_id = current_user.id
+
+        # Bump both lists of a move in a fixed order so writers cannot deadlock
+        versions = {scope: bump_version(scope) for scope in sorted({old_scope, task_scope(task)})}
         db.session.commit()
+
+        if old_scope != task_scope(task):
+            graph_cache.task_deleted(old_scope, versions[old_scope], task.id)
+        graph_cache.task_saved(task, versions[task_scope(task)])
         flash('Task updated successfully!', 'success')
         return redirect(url_for('dashboard'))
 
@@ -262,59 +475,303 @@ def send_email(subject, body, to):
     except Exception as e:
         print(f"Failed to send email: {e}")
 
-def check_and_send_email():
-    """
-    Background task to check for upcoming task deadlines.
+# Users are loaded and reminded in chunks of this size
+REMINDER_CHUNK_SIZE = 500
 
-    Sends email notifications:
-    - 3 days before due date
-    - 1 day before due date
-    - On due date
+# Bounds the catch-up loop after a long outage; buckets of a local day
+# that is already over are skipped anyway (see send_bucket_reminders())
+MAX_REMINDER_CATCH_UP = datetime.timedelta(days=1)
+
+def claim_bucket(name, bucket, previous):
     """
-    with app.app_context():
-        try:
-            # Get all tasks from all users
-            tasks = db.session.query(Task).all()
+    Advance a job's checkpoint from `previous` to `bucket`.
+
+    The conditional update lets only one app process claim a bucket, so
+    several processes running the scheduler do not send reminders twice.
 
-            for task in tasks:
-                task_due_date = task.due_date
-                curr_time = datetime.date.today()
+    Args:
+        name: Job name
+        bucket: Naive UTC bucket start to claim
+        previous: Naive UTC bucket the checkpoint is expected at, None if
+                  the job has never run
 
-                delta = task_due_date - curr_time
+    Returns:
+        True if this process claimed the bucket
+    """
+    try:
+        if previous is None:
+            db.session.add(JobCheckpoint(name=name, last_bucket=bucket))
+            db.session.commit()
+            return True
 
-                # Get user email from task's user relationship
-                user_email = task.user.email
+        claimed = (JobCheckpoint.query.filter_by(name=name, last_bucket=previous)
+                   .update({'last_bucket': bucket}, synchronize_session=False))
+        db.session.commit()
+        return claimed == 1
+    except IntegrityError:
+        db.session.rollback()
+        return False
 
-                if delta.days == 3:
-                    send_email("3 days left",
-                             f"You have 3 days left to complete {task.title} on {task.due_date}.",
-                             user_email)
+def check_and_send_email(now=None):
+    """
+    Background task sending deadline reminders for 15 minute buckets.
 
-                if delta.days == 1:
-                    send_email("1 day left",
-                             f"You have 1 day left to complete {task.title} on {task.due_date}.",
-                             user_email)
+    Processes every bucket since the last one handled (stored in the
+    job_checkpoint table) up to the current one, so a run that was skipped
+    or delayed is caught up by the next. Only users whose local send slot
+    falls in a bucket are processed, so reminders go out at each user's
+    chosen local time and the work is spread over the day. Catch-up never
+    crosses a user's local midnight, see send_bucket_reminders().
 
-                if delta.days == 0:
-                    send_email("Deadline Today",
-                             f"Deadline for task {task.title} is today!",
-                             user_email)
+    Args:
+        now: UTC datetime inside the last bucket to process, defaults to now
+    """
+    with app.app_context():
+        try:
+            current = bucket_start(now)
+            step = datetime.timedelta(minutes=SLOT_MINUTES)
+
+            checkpoint = db.session.get(JobCheckpoint, 'reminders')
+            previous = checkpoint.last_bucket if checkpoint else None
+            if previous is None:
+                bucket = current
+            else:
+                last = previous.replace(tzinfo=datetime.timezone.utc)
+                bucket = max(last + step, current - MAX_REMINDER_CATCH_UP)
+
+            while bucket <= current:
+                claimed = bucket.replace(tzinfo=None)
+                # Another process got there first and carries on from here
+                if not claim_bucket('reminders', claimed, previous):
+                    break
+                send_bucket_reminders(bucket, current)
+                previous = claimed
+                bucket += step
 
         except Exception as e:
             print(f"Error in check_and_send_email: {e}")
 
         return "Check completed."
 
-# Schedule task to run every minute
-sched.add_job(check_and_send_email, 'interval', hours=12)
+def send_bucket_reminders(bucket, current):
+    """
+    Send the reminders of one 15 minute bucket.
+
+    Each user is reminded on the days listed in their reminder offsets
+    (default 3, 1 and 0 days before the due date) for their personal tasks
+    and tasks on their teams' lists.
+
+    A caught-up bucket that falls on an earlier local day than `current`
+    is skipped for that timezone: its offsets would be counted from a day
+    that is already over, e.g. "Deadline Today" for a task due yesterday.
+
+    Args:
+        bucket: Timezone-aware UTC start of the bucket
+        current: Timezone-aware UTC start of the bucket being run now
+    """
+    # Map every timezone in use to its local date and slots
+    local_dates = {}
+    buckets = []
+    for (timezone,) in db.session.query(User.timezone).distinct():
+        today, slots = local_slots(bucket, timezone)
+        if today != local_date(current, timezone):
+            continue
+        local_dates[timezone] = today
+        buckets.extend((timezone, slot) for slot in slots)
+
+    if not buckets:
+        return
+
+    # Indexed lookup on (timezone, reminder_slot)
+    users = (db.session.query(User.id, User.email, User.timezone, User.reminder_offsets)
+             .filter(tuple_(User.timezone, User.reminder_slot).in_(buckets))
+             .order_by(User.id)
+             .all())
+
+    for start in range(0, len(users), REMINDER_CHUNK_SIZE):
+        send_reminders(users[start:start + REMINDER_CHUNK_SIZE], local_dates)
+
+def send_reminders(users, local_dates):
+    """
+    Send reminders to one chunk of users with two task queries.
+
+    Args:
+        users: Rows of (id, email, timezone, reminder_offsets)
+        local_dates: Local date of each timezone at the bucket being processed
+    """
+    recipients = {}
+    due_dates = set()
+    for user_id, email, timezone, reminder_offsets in users:
+        try:
+            offsets = parse_offsets(reminder_offsets)
+        except ValueError:
+            continue
+        today = local_dates[timezone]
+        recipients[user_id] = (email, today, offsets)
+        due_dates.update(today + datetime.timedelta(days=days) for days in offsets)
+
+    if not recipients:
+        return
+
+    personal = (db.session.query(Task, Task.user_id)
+                .filter(Task.user_id.in_(recipients), Task.team_id.is_(None),
+                        Task.due_date.in_(due_dates)))
+    shared = (db.session.query(Task, TeamMembership.user_id)
+              .join(TeamMembership, TeamMembership.team_id == Task.team_id)
+              .filter(TeamMembership.user_id.in_(recipients),
+                      Task.due_date.in_(due_dates)))
+
+    for query in (personal, shared):
+        for task, user_id in query:
+            email, today, offsets = recipients[user_id]
+            days = (task.due_date - today).days
+
+            if days in offsets:
+                subject, body = reminder_text(task, days)
+                send_email(subject, body, email)
+
+def sweep_sessions():
+    """Background task deleting expired server-side sessions in batches"""
+    try:
+        removed = app.session_interface.store.sweep_expired()
+        if removed:
+            print(f"Removed {removed} expired sessions")
+    except Exception as e:
+        print(f"Error in sweep_sessions: {e}")
+
+# Process one reminder bucket every 15 minutes
+# A late run still fires within its bucket, and missed buckets are caught up by the next run
+sched.add_job(check_and_send_email, 'cron', minute='*/15',
+              misfire_grace_time=SLOT_MINUTES * 60, coalesce=True, max_instances=1)
+sched.add_job(sweep_sessions, 'interval', minutes=30)
 sched.start()
 
+# Reminder settings route
+@app.route('/settings', methods=['GET', 'POST'])
+@login_required
+def settings():
+    """
+    Reminder settings route.
+
+    GET: Display form with the user's timezone, send hour and offsets
+    POST: Save settings; a new send hour gets a new slot within that hour
+    """
+    form = ReminderSettingsForm()
+
+    if request.method == 'GET':
+        form.timezone.data = current_user.timezone
+        form.reminder_hour.data = slot_hour(current_user.reminder_slot or 0)
+        form.reminder_offsets.data = current_user.reminder_offsets
+
+    if form.validate_on_submit():
+        current_user.timezone = form.timezone.data
+        current_user.reminder_offsets = ','.join(
+            str(days) for days in parse_offsets(form.reminder_offsets.data))
+
+        if current_user.reminder_slot is None or slot_hour(current_user.reminder_slot) != form.reminder_hour.data:
+            current_user.reminder_slot = slot_for_hour(form.reminder_hour.data)
+
+        db.session.commit()
+        flash('Settings saved successfully!', 'success')
+        return redirect(url_for('dashboard'))
+
+    return render_template('settings.html', form=form, logout_form=LogoutAllForm())
+
+# List teams route
+@app.route('/api/teams', methods=['GET'])
+@login_required
+def api_list_teams():
+    """Return the teams (shared lists) the current user belongs to"""
+    return {'teams': [{'id': team_id, 'name': name, 'role': role}
+                      for team_id, (name, role) in current_memberships().items()]}, 200
+
+# Create team route
+@app.route('/api/teams', methods=['POST'])
+@login_required
+def api_create_team():
+    """
+    Create a team with the current user as owner.
+
+    Expects JSON body: {"name": <team name>}
+    """
+    data = request.get_json(silent=True) or {}
+    name = (data.get('name') or '').strip()
+
+    if not name or len(name) > 80:
+        return {'error': 'name is required (max 80 characters)'}, 400
+
+    team = Team(name=name)
+    db.session.add(team)
+    db.session.flush()
+    db.session.add(TeamMembership(team_id=team.id, user_id=current_user.id, role='owner'))
+    db.session.commit()
+    g.pop('memberships', None)
+
+    return {'id': team.id, 'name': team.name}, 201
+
+# Add team member route
+@app.route('/api/teams/<int:team_id>/members', methods=['POST'])
+@login_required
+def api_add_team_member(team_id):
+    """
+    Add a user to a team. Only team owners can add members.
+
+    Expects JSON body: {"username": <username>}
+    """
+    if not is_team_owner(team_id):
+        return {'error': 'Team not found'}, 404
+
+    data = request.get_json(silent=True) or {}
+    user = User.query.filter_by(username=data.get('username')).first()
+
+    if not user:
+        return {'error': 'User not found'}, 404
+
+    if db.session.get(TeamMembership, (team_id, user.id)):
+        return {'message': 'User is already a member'}, 200
+
+    db.session.add(TeamMembership(team_id=team_id, user_id=user.id, role='member'))
+    db.session.commit()
+
+    return {'message': 'Member added successfully'}, 201
+
+# Remove team member route
+@app.route('/api/teams/<int:team_id>/members/<int:user_id>', methods=['DELETE'])
+@login_required
+def api_remove_team_member(team_id, user_id):
+    """
+    Remove a user from a team.
+
+    Owners can remove anyone, members can only remove themselves. The
+    last owner cannot be removed so a team is never left without one.
+    """
+    if team_id not in current_memberships():
+        return {'error': 'Team not found'}, 404
+
+    if user_id != current_user.id and not is_team_owner(team_id):
+        return {'error': 'Only team owners can remove members'}, 403
+
+    membership = db.session.get(TeamMembership, (team_id, user_id))
+    if not membership:
+        return {'error': 'Member not found'}, 404
+
+    if membership.role == 'owner':
+        owners = TeamMembership.query.filter_by(team_id=team_id, role='owner').count()
+        if owners == 1:
+            return {'error': 'The last owner cannot leave the team'}, 400
+
+    db.session.delete(membership)
+    db.session.commit()
+    g.pop('memberships', None)
+
+    return {'message': 'Member removed successfully'}, 200
+
 # CSV Export
 @app.route('/download_csv')
 @login_required
 def download_csv():
     """
-    Export user's tasks to CSV file.
+    Export user's personal and shared tasks to CSV file.
 
     Returns:
         CSV file download with all task data
@@ -323,15 +780,17 @@ def download_csv():
     cw = csv.writer(s)
 
     # Write header row
-    cw.writerow(['ID', 'Title', 'Description', 'Status', 'Due Date', 'Priority'])
+    cw.writerow(['ID', 'Title', 'Description', 'Status', 'Due Date', 'Priority', 'List'])
 
-    # Get all tasks for current user
-    tasks = Task.query.filter_by(user_id=current_user.id)
+    # Get all personal and shared tasks for current user
+    tasks = visible_tasks()
+    memberships = current_memberships()
 
     # Write task rows
     for task in tasks:
+        list_name = memberships[task.team_id][0] if task.team_id else 'Personal'
         cw.writerow([task.id, task.title, task.description, task.status,
-                    task.due_date, task.priority])
+                    task.due_date, task.priority, list_name])
 
     # Create CSV response
     csv_data = Response(s.getvalue(), mimetype='text/csv')
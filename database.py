@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from reminders import DEFAULT_TIMEZONE, DEFAULT_REMINDER_OFFSETS, default_reminder_slot
 
 # Initializing SQLAlchemy object
 db = SQLAlchemy()
@@ -10,7 +11,18 @@ class User(db.Model, UserMixin):
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(25), unique=True, nullable=False)
     password = db.Column(db.String(255))
-    
+    # Reminder preferences: IANA timezone, days-before-due offsets ("3,1,0")
+    # and the 15 minute slot of the local day reminders are sent in
+    timezone = db.Column(db.String(50), default=DEFAULT_TIMEZONE, nullable=False)
+    reminder_offsets = db.Column(db.String(20), default=DEFAULT_REMINDER_OFFSETS, nullable=False)
+    reminder_slot = db.Column(db.Integer, default=default_reminder_slot)
+    # Bumped on every task/dependency write to the personal list (task_graph.py)
+    graph_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
+    # Scheduler looks users up by (timezone, slot); created by 0005_reminder_preferences.py
+    __table_args__ = (
+        db.Index('ix_user_timezone_reminder_slot', 'timezone', 'reminder_slot'),
+    )
 
     # Task relationship
     tasks = db.relationship('Task', backref='user', lazy='dynamic')
@@ -28,7 +40,70 @@ class Task(db.Model, UserMixin):
     due_date = db.Column(db.Date(), nullable=False)
     priority = db.Column(db.String(8), default="Low", nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Shared list the task belongs to, NULL for personal tasks
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=True)
+
+    # Indexes are created by migrations/versions/0002_task_indexes.py
+    # and 0004_teams.py
+    __table_args__ = (
+        db.Index('ix_task_user_id_status', 'user_id', 'status'),
+        db.Index('ix_task_user_id_priority', 'user_id', 'priority'),
+        db.Index('ix_task_due_date', 'due_date'),
+        db.Index('ix_task_team_id_status', 'team_id', 'status'),
+    )
 
     def __repr__(self):
         return f'<Task {self.id}: {self.title}, User ID: {self.user_id}>'
-    
+
+
+# Defining the TaskDependency model/table (blocked-by edges)
+class TaskDependency(db.Model):
+    """Task `task_id` cannot start until task `blocked_by_id` is completed"""
+    task_id = db.Column(db.Integer, db.ForeignKey('task.id', ondelete='CASCADE'), primary_key=True)
+    blocked_by_id = db.Column(db.Integer, db.ForeignKey('task.id', ondelete='CASCADE'), primary_key=True)
+
+    # Primary key covers task -> blockers, this index covers blocker -> tasks
+    __table_args__ = (
+        db.Index('ix_task_dependency_blocked_by_id', 'blocked_by_id', 'task_id'),
+    )
+
+    def __repr__(self):
+        return f'<TaskDependency {self.task_id} blocked by {self.blocked_by_id}>'
+
+
+# Defining the Team model/table (a shared task list)
+class Team(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), nullable=False)
+    # Bumped on every task/dependency write to the shared list (task_graph.py)
+    graph_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
+    def __repr__(self):
+        return f'<Team {self.id}: {self.name}>'
+
+
+# Defining the TeamMembership model/table
+class TeamMembership(db.Model):
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    # "owner" can manage members, "member" can work on the list
+    role = db.Column(db.String(10), default="member", nullable=False)
+
+    # Primary key covers team -> users, this index covers user -> teams
+    __table_args__ = (
+        db.Index('ix_team_membership_user_id', 'user_id', 'team_id'),
+    )
+
+    def __repr__(self):
+        return f'<TeamMembership team {self.team_id}, user {self.user_id}: {self.role}>'
+
+
+# Defining the JobCheckpoint model/table (progress of scheduled jobs)
+class JobCheckpoint(db.Model):
+    """Last 15 minute bucket a scheduled job has claimed, shared by all app processes"""
+    name = db.Column(db.String(50), primary_key=True)
+    # Naive UTC start of the bucket
+    last_bucket = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<JobCheckpoint {self.name}: {self.last_bucket}>'
@@ -1,6 +1,7 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, DateField, EmailField, PasswordField, SelectField
-from wtforms.validators import DataRequired, Length, InputRequired
+from wtforms.validators import DataRequired, Length, InputRequired, ValidationError
+from reminders import parse_offsets, timezone_choices
 
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[InputRequired()], render_kw={"placeholder": "Enter Username"})
@@ -18,4 +19,23 @@ class CreateTaskForm(FlaskForm):
     description = StringField('Description', validators=[Length(max=100)])
     due_date = DateField('Due Date', validators=[DataRequired()])
     status = SelectField('Status', choices=[("To Do", "To Do"), ("In Progress", "In Progress"), ("Completed", "Completed")], validators=[DataRequired()])
-    priority = SelectField('Priority', choices=[("Low", "Low"), ("Medium", "Medium"), ("High", "High"), ("Critical", "Critical")], validators=[DataRequired()])
\ No newline at end of file
+    priority = SelectField('Priority', choices=[("Low", "Low"), ("Medium", "Medium"), ("High", "High"), ("Critical", "Critical")], validators=[DataRequired()])
+    # Choices are the user's personal list (0) and teams, set in the route
+    team_id = SelectField('List', coerce=int, default=0)
+
+
+class ReminderSettingsForm(FlaskForm):
+    timezone = SelectField('Timezone', choices=timezone_choices(), validators=[DataRequired()])
+    reminder_hour = SelectField('Send reminders at', coerce=int, choices=[(hour, f"{hour:02d}:00") for hour in range(24)])
+    reminder_offsets = StringField('Days before due date', validators=[DataRequired(), Length(max=20)], render_kw={"placeholder": "3,1,0"})
+
+    def validate_reminder_offsets(self, field):
+        try:
+            parse_offsets(field.data)
+        except ValueError:
+            raise ValidationError("Enter comma separated days between 0 and 30, e.g. 3,1,0")
+
+
+# No fields: only carries the CSRF token of the "Log out on all devices" button
+class LogoutAllForm(FlaskForm):
+    pass
@@ -1,6 +1,7 @@
 from app import app
 from database import db
+from online_migrations import upgrade_database
 
 with app.app_context():
-    db.create_all()
-    print("Database tables created successfully!")
+    upgrade_database(db.engine)
+    print("Database migrated to the latest revision!")
@@ -0,0 +1,66 @@
+import sys
+from os import path
+from alembic import context
+from sqlalchemy import create_engine
+
+# Make the app modules importable when running the alembic CLI
+sys.path.insert(0, path.abspath(path.join(path.dirname(__file__), '..')))
+
+from database import db
+from online_migrations import progress_metadata
+
+config = context.config
+target_metadata = db.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate away from the backfill bookkeeping table"""
+    return not (type_ == 'table' and name in progress_metadata.tables)
+
+
+def database_url():
+    """Use the URL from alembic.ini if set, otherwise the Flask app config"""
+    url = config.get_main_option('sqlalchemy.url')
+    if url:
+        return url
+
+    from app import app
+    return app.config['SQLALCHEMY_DATABASE_URI']
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of running against a database"""
+    context.configure(url=database_url(), target_metadata=target_metadata,
+                      include_object=include_object, render_as_batch=True,
+                      literal_binds=True)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run migrations on a live connection"""
+    connection = config.attributes.get('connection')
+
+    # Connection passed in by online_migrations.upgrade_database()
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          include_object=include_object, render_as_batch=True,
+                          transaction_per_migration=True)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(database_url())
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          include_object=include_object, render_as_batch=True,
+                          transaction_per_migration=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
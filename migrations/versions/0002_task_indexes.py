@@ -0,0 +1,27 @@
+"""Indexes for dashboard filters and the reminder scan
+
+Revision ID: 0002_task_indexes
+Revises: 0001_initial
+Create Date: 2026-10-19
+"""
+from online_migrations import create_index_online, drop_index_online
+
+
+revision = '0002_task_indexes'
+down_revision = '0001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Dashboard filters: user_id + status / user_id + priority
+    create_index_online('ix_task_user_id_status', 'task', ['user_id', 'status'])
+    create_index_online('ix_task_user_id_priority', 'task', ['user_id', 'priority'])
+    # Reminder scan looks tasks up by due date
+    create_index_online('ix_task_due_date', 'task', ['due_date'])
+
+
+def downgrade():
+    drop_index_online('ix_task_due_date', 'task')
+    drop_index_online('ix_task_user_id_priority', 'task')
+    drop_index_online('ix_task_user_id_status', 'task')
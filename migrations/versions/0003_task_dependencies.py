@@ -0,0 +1,33 @@
+"""Task dependency (blocked-by) adjacency table
+
+Revision ID: 0003_task_dependencies
+Revises: 0002_task_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003_task_dependencies'
+down_revision = '0002_task_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'task_dependency',
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('blocked_by_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['task.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['blocked_by_id'], ['task.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('task_id', 'blocked_by_id'),
+    )
+    # New table, so a plain CREATE INDEX takes no meaningful lock
+    op.create_index('ix_task_dependency_blocked_by_id', 'task_dependency',
+                    ['blocked_by_id', 'task_id'])
+
+
+def downgrade():
+    op.drop_index('ix_task_dependency_blocked_by_id', 'task_dependency')
+    op.drop_table('task_dependency')
@@ -0,0 +1,53 @@
+"""Teams, memberships and shared task lists
+
+Revision ID: 0004_teams
+Revises: 0003_task_dependencies
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from online_migrations import create_index_online, drop_index_online
+
+
+revision = '0004_teams'
+down_revision = '0003_task_dependencies'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'team',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'team_membership',
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('role', sa.String(length=10), nullable=False),
+        sa.ForeignKeyConstraint(['team_id'], ['team.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('team_id', 'user_id'),
+    )
+    op.create_index('ix_team_membership_user_id', 'team_membership', ['user_id', 'team_id'])
+
+    # Nullable column without a default: no table rewrite needed. SQLite
+    # cannot add a constraint without copying the table (and does not
+    # enforce foreign keys by default), so it only gets the plain column.
+    op.add_column('task', sa.Column('team_id', sa.Integer(), nullable=True))
+    if op.get_bind().dialect.name != 'sqlite':
+        op.create_foreign_key('fk_task_team_id', 'task', 'team', ['team_id'], ['id'])
+    create_index_online('ix_task_team_id_status', 'task', ['team_id', 'status'])
+
+
+def downgrade():
+    drop_index_online('ix_task_team_id_status', 'task')
+    if op.get_bind().dialect.name != 'sqlite':
+        op.drop_constraint('fk_task_team_id', 'task', type_='foreignkey')
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('team_id')
+    op.drop_index('ix_team_membership_user_id', 'team_membership')
+    op.drop_table('team_membership')
+    op.drop_table('team')
@@ -0,0 +1,41 @@
+"""Per-user timezone, reminder offsets and send slot
+
+Revision ID: 0005_reminder_preferences
+Revises: 0004_teams
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from online_migrations import batched_backfill, create_index_online, drop_index_online
+
+
+revision = '0005_reminder_preferences'
+down_revision = '0004_teams'
+branch_labels = None
+depends_on = None
+
+users = sa.table('user', sa.column('id', sa.Integer), sa.column('reminder_slot', sa.Integer))
+
+
+def upgrade():
+    op.add_column('user', sa.Column('timezone', sa.String(length=50),
+                                    server_default='UTC', nullable=False))
+    op.add_column('user', sa.Column('reminder_offsets', sa.String(length=20),
+                                    server_default='3,1,0', nullable=False))
+    op.add_column('user', sa.Column('reminder_slot', sa.Integer(), nullable=True))
+
+    # Spread existing users over the four 09:xx slots (36-39)
+    with op.get_context().autocommit_block():
+        batched_backfill(op.get_bind(), users, {'reminder_slot': 36 + users.c.id % 4},
+                         where=users.c.reminder_slot.is_(None),
+                         name='0005_user_reminder_slot')
+
+    create_index_online('ix_user_timezone_reminder_slot', 'user', ['timezone', 'reminder_slot'])
+
+
+def downgrade():
+    drop_index_online('ix_user_timezone_reminder_slot', 'user')
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('reminder_slot')
+        batch_op.drop_column('reminder_offsets')
+        batch_op.drop_column('timezone')
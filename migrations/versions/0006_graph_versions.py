@@ -0,0 +1,29 @@
+"""Per-list graph version counters
+
+Revision ID: 0006_graph_versions
+Revises: 0005_reminder_preferences
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006_graph_versions'
+down_revision = '0005_reminder_preferences'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Constant server default: no backfill and no table rewrite needed
+    op.add_column('user', sa.Column('graph_version', sa.Integer(),
+                                    server_default='0', nullable=False))
+    op.add_column('team', sa.Column('graph_version', sa.Integer(),
+                                    server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('team') as batch_op:
+        batch_op.drop_column('graph_version')
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('graph_version')
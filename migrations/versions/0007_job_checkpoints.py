@@ -0,0 +1,27 @@
+"""Checkpoints of scheduled jobs
+
+Revision ID: 0007_job_checkpoints
+Revises: 0006_graph_versions
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007_job_checkpoints'
+down_revision = '0006_graph_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'job_checkpoint',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_bucket', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade():
+    op.drop_table('job_checkpoint')
@@ -0,0 +1,190 @@
+from os import path
+import time
+import datetime
+from alembic import command, op
+from alembic.config import Config
+from sqlalchemy import MetaData, Table, Column, String, Integer, Boolean, DateTime
+from sqlalchemy import select, update, func, inspect
+from sqlalchemy.engine import Engine
+
+basedir = path.abspath(path.dirname(__file__))
+
+# Bookkeeping table used to resume interrupted backfills.
+# Kept out of db.metadata so create_all() and autogenerate leave it alone.
+progress_metadata = MetaData()
+
+backfill_progress = Table(
+    'backfill_progress', progress_metadata,
+    Column('name', String(100), primary_key=True),
+    Column('last_id', Integer, nullable=False, default=0),
+    Column('rows_done', Integer, nullable=False, default=0),
+    Column('finished', Boolean, nullable=False, default=False),
+    Column('updated_at', DateTime, nullable=False),
+)
+
+BASELINE_REVISION = '0001_initial'
+
+
+def alembic_config(connection=None):
+    """
+    Build an Alembic config pointing at the migrations/ directory.
+
+    Args:
+        connection: Optional SQLAlchemy connection handed to env.py
+    """
+    config = Config(path.join(basedir, 'migrations', 'alembic.ini'))
+    config.set_main_option('script_location', path.join(basedir, 'migrations'))
+    config.attributes['connection'] = connection
+    return config
+
+
+def upgrade_database(engine, revision='head'):
+    """
+    Upgrade the database to the given revision.
+
+    Databases created before migrations existed (via db.create_all()) are
+    stamped with the baseline revision first so only newer changes run.
+    """
+    with engine.connect() as connection:
+        config = alembic_config(connection)
+        tables = inspect(connection).get_table_names()
+        # Let Alembic own the transactions so autocommit blocks work
+        connection.commit()
+
+        if 'user' in tables and 'alembic_version' not in tables:
+            command.stamp(config, BASELINE_REVISION)
+
+        command.upgrade(config, revision)
+        connection.commit()
+
+
+def supports_concurrent_index(bind):
+    """Check if the database can build indexes without blocking writes"""
+    return bind.dialect.name == 'postgresql'
+
+
+def create_index_online(index_name, table_name, columns, unique=False):
+    """
+    Create an index from inside a migration without a long write lock.
+
+    On PostgreSQL the index is built with CREATE INDEX CONCURRENTLY outside
+    the migration transaction. SQLite builds indexes quickly and has no
+    concurrent mode, so a plain CREATE INDEX IF NOT EXISTS is used there.
+    """
+    if supports_concurrent_index(op.get_bind()):
+        with op.get_context().autocommit_block():
+            op.create_index(index_name, table_name, columns, unique=unique,
+                            if_not_exists=True, postgresql_concurrently=True)
+    else:
+        op.create_index(index_name, table_name, columns, unique=unique,
+                        if_not_exists=True)
+
+
+def drop_index_online(index_name, table_name):
+    """Drop an index created by create_index_online()"""
+    if supports_concurrent_index(op.get_bind()):
+        with op.get_context().autocommit_block():
+            op.drop_index(index_name, table_name, if_exists=True,
+                          postgresql_concurrently=True)
+    else:
+        op.drop_index(index_name, table_name, if_exists=True)
+
+
+def print_progress(name, rows_done, total, last_id):
+    """Default progress reporter for batched_backfill()"""
+    print(f"Backfill {name}: {rows_done}/{total} rows (last id {last_id})")
+
+
+def batched_backfill(bind, table, values, where=None, name=None, batch_size=500,
+                     pause=0.1, progress=print_progress):
+    """
+    Update rows of a table in small primary-key ordered chunks.
+
+    Each chunk is committed together with its checkpoint in the
+    backfill_progress table, so a backfill that is interrupted picks up
+    after the last committed chunk when it is run again. On an autocommit
+    Connection the two are separate statements, so `values` and `where`
+    should be safe to apply twice to the same rows.
+
+    Args:
+        bind: Engine (one transaction per chunk) or Connection. A
+              Connection should be in autocommit mode, e.g. inside
+              op.get_context().autocommit_block() in a migration.
+        table: Table with an integer "id" primary key
+        values: Dict of column values passed to UPDATE ... SET
+        where: Optional filter selecting the rows still to backfill
+        name: Checkpoint name, defaults to "<table>_backfill"
+        batch_size: Rows updated per chunk
+        pause: Seconds to sleep between chunks to throttle load
+        progress: Callable(name, rows_done, total, last_id) or None
+
+    Returns:
+        Total number of rows updated across all runs
+    """
+    name = name or f'{table.name}_backfill'
+    pk = table.c.id
+
+    def run(statement):
+        if isinstance(bind, Engine):
+            with bind.begin() as connection:
+                return statement(connection)
+        return statement(bind)
+
+    def load_checkpoint(connection):
+        progress_metadata.create_all(connection, checkfirst=True)
+        row = connection.execute(
+            select(backfill_progress).where(backfill_progress.c.name == name)
+        ).first()
+        if row is None:
+            connection.execute(backfill_progress.insert().values(
+                name=name, last_id=0, rows_done=0, finished=False,
+                updated_at=datetime.datetime.utcnow()))
+            return 0, 0, False
+        return row.last_id, row.rows_done, row.finished
+
+    last_id, rows_done, finished = run(load_checkpoint)
+    if finished:
+        return rows_done
+
+    def pending(after):
+        query = select(pk).where(pk > after)
+        if where is not None:
+            query = query.where(where)
+        return query
+
+    total = rows_done + run(lambda connection: connection.execute(
+        select(func.count()).select_from(pending(last_id).subquery())
+    ).scalar())
+
+    while True:
+        def process_chunk(connection):
+            ids = connection.execute(
+                pending(last_id).order_by(pk).limit(batch_size)
+            ).scalars().all()
+
+            if ids:
+                connection.execute(update(table).where(pk.in_(ids)).values(**values))
+
+            connection.execute(
+                backfill_progress.update()
+                .where(backfill_progress.c.name == name)
+                .values(last_id=ids[-1] if ids else last_id,
+                        rows_done=rows_done + len(ids),
+                        finished=not ids,
+                        updated_at=datetime.datetime.utcnow()))
+            return ids
+
+        ids = run(process_chunk)
+        if not ids:
+            break
+
+        last_id = ids[-1]
+        rows_done += len(ids)
+
+        if progress:
+            progress(name, rows_done, total, last_id)
+
+        if pause:
+            time.sleep(pause)
+
+    return rows_done
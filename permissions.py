@@ -0,0 +1,59 @@
+from flask import g
+from flask_login import current_user
+from sqlalchemy import or_, and_
+from database import db, Task, Team, TeamMembership
+
+
+def current_memberships():
+    """
+    Teams of the current user as {team_id: (name, role)}.
+
+    Looked up with a single query the first time it is needed in a request
+    and cached on flask.g for the rest of it.
+    """
+    if 'memberships' not in g:
+        rows = (db.session.query(Team.id, Team.name, TeamMembership.role)
+                .join(TeamMembership, TeamMembership.team_id == Team.id)
+                .filter(TeamMembership.user_id == current_user.id)
+                .order_by(Team.name))
+        g.memberships = {team_id: (name, role) for team_id, name, role in rows}
+    return g.memberships
+
+
+def visible_tasks_filter():
+    """
+    SQL condition matching every task the current user may see and edit.
+
+    That is their own personal tasks plus all tasks on their teams' lists.
+    The membership check is part of the WHERE clause so rows are never
+    checked one by one in Python.
+    """
+    personal = and_(Task.user_id == current_user.id, Task.team_id.is_(None))
+    team_ids = list(current_memberships())
+
+    if not team_ids:
+        return personal
+    return or_(personal, Task.team_id.in_(team_ids))
+
+
+def visible_tasks():
+    """Task query restricted to tasks the current user can see"""
+    return Task.query.filter(visible_tasks_filter())
+
+
+def is_team_owner(team_id):
+    """Check if the current user owns the given team"""
+    membership = current_memberships().get(team_id)
+    return membership is not None and membership[1] == 'owner'
+
+
+def can_remove_task(task):
+    """
+    Check if the current user may delete a visible task or move it off its list.
+
+    Personal tasks are only visible to their owner. Team tasks can be
+    edited by every member, but only their creator or a team owner can
+    take them off the shared list.
+    """
+    return (task.team_id is None or task.user_id == current_user.id
+            or is_team_owner(task.team_id))
@@ -0,0 +1,104 @@
+import datetime
+import random
+from zoneinfo import ZoneInfo, available_timezones
+
+# Users are processed in 15 minute buckets of their local day (96 slots)
+SLOT_MINUTES = 15
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+
+DEFAULT_TIMEZONE = 'UTC'
+DEFAULT_REMINDER_HOUR = 9
+DEFAULT_REMINDER_OFFSETS = '3,1,0'
+MAX_REMINDER_OFFSET = 30
+
+
+def slot_for_hour(hour):
+    """
+    Pick a local send slot within the given hour.
+
+    The slot inside the hour is random so users who choose the same hour
+    are spread over four buckets instead of all being sent at once.
+    """
+    return hour * SLOTS_PER_HOUR + random.randrange(SLOTS_PER_HOUR)
+
+
+def default_reminder_slot():
+    """Column default for User.reminder_slot"""
+    return slot_for_hour(DEFAULT_REMINDER_HOUR)
+
+
+def slot_hour(slot):
+    """Local hour a send slot falls in"""
+    return slot // SLOTS_PER_HOUR
+
+
+def local_slots(now, timezone):
+    """
+    Local date and the send slots covered by a bucket in a timezone.
+
+    Normally this is the single slot `now` falls in. When clocks jump
+    forward the skipped slots are included so those users still get their
+    reminders, and the repeated hour after clocks go back is skipped so
+    nobody gets them twice.
+
+    Args:
+        now: Timezone-aware UTC start of the bucket
+        timezone: IANA timezone name, e.g. "Europe/Sofia"
+    """
+    zone = ZoneInfo(timezone)
+    local = now.astimezone(zone)
+    if local.fold:
+        return local.date(), []
+
+    previous = (now - datetime.timedelta(minutes=SLOT_MINUTES)).astimezone(zone)
+    slot = (local.hour * 60 + local.minute) // SLOT_MINUTES
+
+    if previous.date() != local.date():
+        first = 0
+    else:
+        first = (previous.hour * 60 + previous.minute) // SLOT_MINUTES + 1
+
+    return local.date(), list(range(min(first, slot), slot + 1))
+
+
+def local_date(now, timezone):
+    """Date in a timezone at the timezone-aware datetime `now`"""
+    return now.astimezone(ZoneInfo(timezone)).date()
+
+
+def bucket_start(now=None):
+    """UTC start of the bucket containing `now` (defaults to current time)"""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now.replace(minute=now.minute - now.minute % SLOT_MINUTES,
+                       second=0, microsecond=0)
+
+
+def parse_offsets(value):
+    """
+    Parse a reminder offsets string such as "3,1,0".
+
+    Returns a sorted list of unique day offsets, raises ValueError for
+    anything that is not a comma separated list of 0-30.
+    """
+    offsets = set()
+    for part in value.split(','):
+        days = int(part.strip())
+        if not 0 <= days <= MAX_REMINDER_OFFSET:
+            raise ValueError(f"Reminder offsets must be between 0 and {MAX_REMINDER_OFFSET}")
+        offsets.add(days)
+    return sorted(offsets, reverse=True)
+
+
+def timezone_choices():
+    """Sorted (value, label) choices of all IANA timezones"""
+    return [(name, name) for name in sorted(available_timezones())]
+
+
+def reminder_text(task, days):
+    """Email subject and body for a task due in `days` days"""
+    if days == 0:
+        return "Deadline Today", f"Deadline for task {task.title} is today!"
+    if days == 1:
+        return "1 day left", f"You have 1 day left to complete {task.title} on {task.due_date}."
+    return (f"{days} days left",
+            f"You have {days} days left to complete {task.title} on {task.due_date}.")
@@ -0,0 +1,397 @@
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from flask.sessions import SessionInterface, SecureCookieSession, session_json_serializer
+
+# Session ids are 32 random bytes, url-safe base64 encoded (43 characters)
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+# Store lifetimes of sessions that are not permanent logged in sessions,
+# overridable with SESSION_ANONYMOUS_LIFETIME and SESSION_IDLE_LIFETIME
+ANONYMOUS_SESSION_LIFETIME = timedelta(hours=1)
+IDLE_SESSION_LIFETIME = timedelta(days=1)
+
+
+def new_session_id():
+    """Generate an unguessable session id"""
+    return secrets.token_urlsafe(32)
+
+
+class ServerSideSession(SecureCookieSession):
+    """
+    Session whose data lives in a SessionStore; the cookie only holds `sid`.
+    """
+
+    def __init__(self, initial=None, sid=None, new=False, expires_at=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.new = new
+        self.expires_at = expires_at
+        self.previous_sid = None
+
+    def regenerate(self):
+        """
+        Move the session to a fresh id, keeping its data.
+
+        Called on login so an id set before authentication (session
+        fixation) cannot be used afterwards.
+        """
+        if not self.new:
+            self.previous_sid = self.sid
+        self.sid = new_session_id()
+        self.modified = True
+
+
+class SQLiteSessionStore:
+    """
+    Sessions in a SQLite table with an in-memory LRU cache in front.
+
+    Most requests are served from the LRU without touching SQLite. Cached
+    entries are trusted for `lru_ttl` seconds, which bounds how long a
+    session revoked by another process on the same host stays usable.
+    """
+
+    def __init__(self, path, lru_size=1024, lru_ttl=5):
+        self.lru_size = lru_size
+        self.lru_ttl = lru_ttl
+        self._lru = OrderedDict()   # sid -> (data, user_id, expires_at, cached_at)
+        self._lock = threading.Lock()
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ':memory:':
+            self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                sid TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                user_id TEXT,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at);
+            CREATE INDEX IF NOT EXISTS ix_sessions_user_id ON sessions (user_id);
+        ''')
+
+    def _cache(self, sid, data, user_id, expires_at):
+        self._lru[sid] = (data, user_id, expires_at, time.time())
+        self._lru.move_to_end(sid)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def load(self, sid):
+        """Return (data, expires_at) for a live session, or None"""
+        now = time.time()
+
+        with self._lock:
+            cached = self._lru.get(sid)
+            if cached is not None and now - cached[3] < self.lru_ttl:
+                self._lru.move_to_end(sid)
+                data, _, expires_at, _ = cached
+                return (data, expires_at) if expires_at > now else None
+
+            row = self._connection.execute(
+                'SELECT data, user_id, expires_at FROM sessions WHERE sid = ? AND expires_at > ?',
+                (sid, now)).fetchone()
+
+            if row is None:
+                self._lru.pop(sid, None)
+                return None
+
+            self._cache(sid, *row)
+            return row[0], row[2]
+
+    def save(self, sid, data, user_id, expires_at, create=True):
+        """
+        Insert or replace a session, returns False if it was not saved.
+
+        With create=False only a live session is updated, so a request
+        still holding a session that was revoked or expired meanwhile
+        cannot write it back.
+        """
+        with self._lock:
+            if create:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO sessions (sid, data, user_id, expires_at) VALUES (?, ?, ?, ?)',
+                    (sid, data, user_id, expires_at))
+            elif not self._connection.execute(
+                    'UPDATE sessions SET data = ?, user_id = ?, expires_at = ? '
+                    'WHERE sid = ? AND expires_at > ?',
+                    (data, user_id, expires_at, sid, time.time())).rowcount:
+                self._lru.pop(sid, None)
+                return False
+
+            self._cache(sid, data, user_id, expires_at)
+            return True
+
+    def delete(self, sid):
+        """Delete a single session"""
+        with self._lock:
+            self._connection.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+            self._lru.pop(sid, None)
+
+    def revoke_user(self, user_id):
+        """Delete every session of a user, returns the number deleted"""
+        user_id = str(user_id)
+        with self._lock:
+            deleted = self._connection.execute(
+                'DELETE FROM sessions WHERE user_id = ?', (user_id,)).rowcount
+            for sid in [sid for sid, cached in self._lru.items() if cached[1] == user_id]:
+                del self._lru[sid]
+        return deleted
+
+    def sweep_expired(self, batch_size=500, pause=0.0):
+        """
+        Delete expired sessions in batches, returns the number deleted.
+
+        Each batch is its own short statement so the sweep never holds the
+        write lock for long.
+        """
+        total = 0
+        while True:
+            with self._lock:
+                deleted = self._connection.execute(
+                    'DELETE FROM sessions WHERE sid IN '
+                    '(SELECT sid FROM sessions WHERE expires_at <= ? LIMIT ?)',
+                    (time.time(), batch_size)).rowcount
+            total += deleted
+
+            if deleted < batch_size:
+                return total
+            if pause:
+                time.sleep(pause)
+
+
+def _text(value):
+    """Redis returns bytes unless the client uses decode_responses"""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RedisSessionStore:
+    """
+    Sessions in Redis, shared by every app node.
+
+    Each session is a hash that Redis expires on its own. A set per user
+    lists their session ids so all of them can be revoked at once; ids of
+    expired sessions are pruned from it by sweep_expired().
+    """
+
+    def __init__(self, client, prefix='session:'):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, sid):
+        return f'{self.prefix}{sid}'
+
+    def _user_key(self, user_id):
+        return f'{self.prefix}user:{user_id}'
+
+    def load(self, sid):
+        """Return (data, expires_at) for a live session, or None"""
+        pipe = self.client.pipeline()
+        pipe.hget(self._key(sid), 'data')
+        pipe.hget(self._key(sid), 'expires_at')
+        data, expires_at = pipe.execute()
+
+        if data is None:
+            return None
+        return _text(data), float(expires_at)
+
+    def save(self, sid, data, user_id, expires_at, create=True):
+        """
+        Insert or replace a session, returns False if it was not saved.
+
+        With create=False the session must still exist. The check and the
+        write run under WATCH, so a revoke or expiry in between makes the
+        save retry and see the session gone instead of recreating it.
+        """
+        from redis.exceptions import WatchError
+
+        key = self._key(sid)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    if not create and not pipe.exists(key):
+                        return False
+
+                    pipe.multi()
+                    pipe.hset(key, mapping={'data': data, 'user_id': user_id or '',
+                                            'expires_at': expires_at})
+                    pipe.expireat(key, int(expires_at) + 1)
+                    if user_id:
+                        pipe.sadd(self._user_key(user_id), sid)
+                    pipe.execute()
+                    return True
+                except WatchError:
+                    continue
+
+    def delete(self, sid):
+        """Delete a single session"""
+        user_id = self.client.hget(self._key(sid), 'user_id')
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(sid))
+        if user_id:
+            pipe.srem(self._user_key(_text(user_id)), sid)
+        pipe.execute()
+
+    def revoke_user(self, user_id, batch_size=500):
+        """
+        Delete every session of a user, returns the number deleted.
+
+        Each batch deletes its sessions and removes exactly those ids from
+        the user's set in one MULTI/EXEC, so the id of a session saved
+        while revoking stays in the set and can still be revoked later.
+        """
+        user_key = self._user_key(user_id)
+        sids = [_text(sid) for sid in self.client.smembers(user_key)]
+
+        deleted = 0
+        for start in range(0, len(sids), batch_size):
+            batch = sids[start:start + batch_size]
+            pipe = self.client.pipeline(transaction=True)
+            pipe.delete(*[self._key(sid) for sid in batch])
+            pipe.srem(user_key, *batch)
+            deleted += pipe.execute()[0]
+        return deleted
+
+    def sweep_expired(self, batch_size=500, pause=0.0):
+        """
+        Prune ids of expired sessions from the per-user sets.
+
+        Redis expires the sessions themselves; this only keeps the user sets
+        from growing. Works through the keyspace with SCAN in batches.
+        Returns the number of stale ids removed.
+        """
+        removed = 0
+        for user_key in self.client.scan_iter(match=self._user_key('*'), count=batch_size):
+            cursor = 0
+            while True:
+                cursor, sids = self.client.sscan(user_key, cursor, count=batch_size)
+                if sids:
+                    pipe = self.client.pipeline()
+                    for sid in sids:
+                        pipe.exists(self._key(_text(sid)))
+                    stale = [sid for sid, alive in zip(sids, pipe.execute()) if not alive]
+                    if stale:
+                        removed += self.client.srem(user_key, *stale)
+                if cursor == 0:
+                    break
+
+            if pause:
+                time.sleep(pause)
+        return removed
+
+
+def create_session_store(config):
+    """
+    Build the session store selected by SESSION_BACKEND.
+
+    "sqlite" (default) uses SESSION_SQLITE_PATH, "redis" connects to
+    SESSION_REDIS_URL and needs the optional `redis` package.
+    """
+    backend = config.get('SESSION_BACKEND', 'sqlite')
+
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_BACKEND=redis requires the redis package (pip install redis)")
+        return RedisSessionStore(redis.Redis.from_url(config['SESSION_REDIS_URL']))
+
+    if backend == 'sqlite':
+        return SQLiteSessionStore(config.get('SESSION_SQLITE_PATH', ':memory:'),
+                                  lru_size=config.get('SESSION_LRU_SIZE', 1024))
+
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Flask session interface keeping session data in a SessionStore.
+
+    The cookie only carries the session id. Unchanged sessions are only
+    written back once less than half of their lifetime remains, so store
+    entries expire after that long without use (see session_lifetime()).
+    """
+
+    serializer = session_json_serializer
+
+    def __init__(self, store):
+        self.store = store
+
+    def session_lifetime(self, app, session):
+        """
+        Seconds a session is kept in the store after its last write.
+
+        Only permanent sessions of logged in users live for
+        PERMANENT_SESSION_LIFETIME. Anonymous sessions, e.g. the CSRF token
+        of every visitor to the login page, expire after an hour so they
+        cannot pile up, and other sessions after a day without use.
+        """
+        if '_user_id' not in session:
+            lifetime = app.config.get('SESSION_ANONYMOUS_LIFETIME', ANONYMOUS_SESSION_LIFETIME)
+        elif not session.permanent:
+            lifetime = app.config.get('SESSION_IDLE_LIFETIME', IDLE_SESSION_LIFETIME)
+        else:
+            lifetime = app.permanent_session_lifetime
+        return lifetime.total_seconds()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+
+        if sid and SESSION_ID_PATTERN.match(sid):
+            record = self.store.load(sid)
+            if record is not None:
+                data, expires_at = record
+                return ServerSideSession(self.serializer.loads(data), sid=sid,
+                                         expires_at=expires_at)
+
+        return ServerSideSession(sid=new_session_id(), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if session.previous_sid:
+            self.store.delete(session.previous_sid)
+
+        # Emptied sessions are deleted together with their cookie
+        if not session:
+            if session.modified:
+                if not session.new:
+                    self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add("Cookie")
+            return
+
+        lifetime = self.session_lifetime(app, session)
+        now = time.time()
+        stale = session.expires_at is None or session.expires_at - now < lifetime / 2
+
+        if session.modified or stale:
+            # Only new or regenerated ids are inserted; an existing session
+            # that was revoked or expired meanwhile is not brought back
+            create = session.new or session.previous_sid is not None
+            if not self.store.save(session.sid, self.serializer.dumps(dict(session)),
+                                   session.get('_user_id'), now + lifetime, create=create):
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add("Cookie")
+                return
+
+        if session.modified or session.new or self.should_set_cookie(app, session):
+            response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                                httponly=httponly, domain=domain, path=path,
+                                secure=secure, samesite=samesite)
+            response.vary.add("Cookie")
@@ -0,0 +1,385 @@
+import heapq
+import threading
+from collections import OrderedDict, defaultdict
+from sqlalchemy import select, update
+from database import db, User, Task, TaskDependency, Team
+
+
+class DependencyCycleError(ValueError):
+    """Raised when a new dependency would make the graph cyclic"""
+
+
+class TaskGraph:
+    """
+    In-memory dependency graph for the tasks of one list.
+
+    Edges point from a blocker to the tasks it blocks. Topological order
+    and critical path are cached and only recomputed after an edit that
+    can change them. Cached graphs are shared between request threads, so
+    every edit and traversal holds the graph's lock; results are computed
+    from a consistent graph and never cached from a half-applied edit.
+    """
+
+    def __init__(self):
+        self.tasks = {}                  # task id -> (due_date, status)
+        self.blocks = defaultdict(set)   # blocker id -> dependent task ids
+        self.blocked_by = defaultdict(set)  # task id -> blocker ids
+        self._order = None
+        self._critical_path = None
+        self.version = None              # graph_version of the list when loaded
+        # Reentrant: critical_path() calls topological_order()
+        self.lock = threading.RLock()
+
+    def set_task(self, task_id, due_date, status):
+        """Add a task or update its due date and status"""
+        with self.lock:
+            previous = self.tasks.get(task_id)
+            self.tasks[task_id] = (due_date, status)
+
+            # Ties in the topological order are broken by due date
+            if previous is None or previous[0] != due_date:
+                self._order = None
+                self._critical_path = None
+
+    def remove_task(self, task_id):
+        """Remove a task together with all of its edges"""
+        with self.lock:
+            if self.tasks.pop(task_id, None) is None:
+                return
+
+            for dependent in self.blocks.pop(task_id, set()):
+                self.blocked_by[dependent].discard(task_id)
+            for blocker in self.blocked_by.pop(task_id, set()):
+                self.blocks[blocker].discard(task_id)
+
+            self._order = None
+            self._critical_path = None
+
+    def would_create_cycle(self, task_id, blocked_by_id):
+        """Check if `task_id` already (transitively) blocks `blocked_by_id`"""
+        if task_id == blocked_by_id:
+            return True
+
+        with self.lock:
+            seen = {task_id}
+            stack = [task_id]
+            while stack:
+                for dependent in self.blocks.get(stack.pop(), ()):
+                    if dependent == blocked_by_id:
+                        return True
+                    if dependent not in seen:
+                        seen.add(dependent)
+                        stack.append(dependent)
+            return False
+
+    def add_edge(self, task_id, blocked_by_id):
+        """Record that `task_id` is blocked by `blocked_by_id`"""
+        with self.lock:
+            if self.would_create_cycle(task_id, blocked_by_id):
+                raise DependencyCycleError(
+                    f"Task {blocked_by_id} already depends on task {task_id}")
+
+            self.blocks[blocked_by_id].add(task_id)
+            self.blocked_by[task_id].add(blocked_by_id)
+            self._order = None
+            self._critical_path = None
+
+    def remove_edge(self, task_id, blocked_by_id):
+        """Remove a blocked-by edge if present"""
+        with self.lock:
+            self.blocks[blocked_by_id].discard(task_id)
+            self.blocked_by[task_id].discard(blocked_by_id)
+            self._order = None
+            self._critical_path = None
+
+    def topological_order(self):
+        """
+        Return task ids so every task comes after all of its blockers.
+
+        Kahn's algorithm; among tasks that are ready at the same time the
+        one due first comes first.
+        """
+        with self.lock:
+            if self._order is not None:
+                return self._order
+
+            remaining = {task_id: len(self.blocked_by.get(task_id, ())) for task_id in self.tasks}
+            ready = [(self.tasks[task_id][0], task_id)
+                     for task_id, count in remaining.items() if count == 0]
+            heapq.heapify(ready)
+
+            order = []
+            while ready:
+                _, task_id = heapq.heappop(ready)
+                order.append(task_id)
+                for dependent in self.blocks.get(task_id, ()):
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        heapq.heappush(ready, (self.tasks[dependent][0], dependent))
+
+            self._order = order
+            return order
+
+    def critical_path(self):
+        """
+        Return the chain of dependent tasks that sets the latest finish.
+
+        Tasks carry due dates but no durations, so the project finishes at
+        the latest due date. The path ends at the task due last and walks
+        back through the blocker due latest at each step, i.e. the one
+        with the least slack before the task it blocks. A long chain
+        finishing this week therefore loses to a shorter one due next
+        year. Ties between equal due dates go to the longer chain.
+        """
+        with self.lock:
+            if self._critical_path is not None:
+                return self._critical_path
+
+            # Blockers come first in topological order, so each task's
+            # latest-due blocker chain is known when the task is reached
+            length = {}
+            previous = {}
+            for task_id in self.topological_order():
+                blockers = self.blocked_by.get(task_id, ())
+                blocker = max(blockers, key=lambda key: (self.tasks[key][0], length[key], -key),
+                              default=None)
+                previous[task_id] = blocker
+                length[task_id] = length[blocker] + 1 if blocker is not None else 1
+
+            path = []
+            if length:
+                task_id = max(length, key=lambda key: (self.tasks[key][0], length[key], -key))
+                while task_id is not None:
+                    path.append(task_id)
+                    task_id = previous[task_id]
+                path.reverse()
+
+            self._critical_path = path
+            return path
+
+    def is_blocked(self, task_id):
+        """A task is blocked while any of its blockers is not completed"""
+        with self.lock:
+            return any(self.tasks[blocker][1] != 'Completed'
+                       for blocker in self.blocked_by.get(task_id, ()))
+
+    def blocked_status(self):
+        """Split task ids into blocked and unblocked lists"""
+        with self.lock:
+            blocked, unblocked = [], []
+            for task_id in self.tasks:
+                (blocked if self.is_blocked(task_id) else unblocked).append(task_id)
+            return blocked, unblocked
+
+
+def task_scope(task):
+    """Graph key of the list a task lives on: ('team', id) or ('user', id)"""
+    if task.team_id is not None:
+        return ('team', task.team_id)
+    return ('user', task.user_id)
+
+
+def scope_filter(scope):
+    """SQL condition selecting the tasks of a graph scope"""
+    kind, scope_id = scope
+    if kind == 'team':
+        return Task.team_id == scope_id
+    return (Task.user_id == scope_id) & Task.team_id.is_(None)
+
+
+def scope_model(scope):
+    """Model holding the graph_version of a scope, and its id"""
+    kind, scope_id = scope
+    return (Team if kind == 'team' else User), scope_id
+
+
+def graph_version(scope):
+    """Committed graph_version of a scope"""
+    model, scope_id = scope_model(scope)
+    return db.session.scalar(select(model.graph_version).where(model.id == scope_id))
+
+
+def bump_version(scope):
+    """
+    Increment a scope's graph_version in the current transaction.
+
+    Must run before a task or dependency of the list is written. Besides
+    telling other processes their cached graph is stale, the UPDATE holds
+    the row lock until commit, so writers on one list are serialized.
+
+    Returns:
+        The new version
+    """
+    model, scope_id = scope_model(scope)
+    db.session.execute(update(model).where(model.id == scope_id)
+                       .values(graph_version=model.graph_version + 1))
+    return graph_version(scope)
+
+
+def creates_cycle(task_id, blocked_by_id):
+    """
+    Check in SQL if `task_id` already (transitively) blocks `blocked_by_id`.
+
+    Walks task_dependency downstream from `task_id` with a recursive CTE,
+    so the answer reflects committed edges rather than a cached graph.
+    """
+    if task_id == blocked_by_id:
+        return True
+
+    dependents = (select(TaskDependency.task_id.label('id'))
+                  .where(TaskDependency.blocked_by_id == task_id)
+                  .cte('dependents', recursive=True))
+    # UNION (not UNION ALL) drops visited tasks so the walk always ends
+    dependents = dependents.union(
+        select(TaskDependency.task_id)
+        .join(dependents, TaskDependency.blocked_by_id == dependents.c.id))
+
+    query = select(dependents.c.id).where(dependents.c.id == blocked_by_id).limit(1)
+    return db.session.execute(query).first() is not None
+
+
+def add_dependency(scope, task_id, blocked_by_id, cache=None):
+    """
+    Insert and commit a blocked-by edge between two tasks of a list.
+
+    The list's version is bumped first, so a concurrent insert on the same
+    list waits for this transaction and then sees its edge in the cycle
+    check.
+
+    Returns:
+        False if the edge already exists, True once it is added
+
+    Raises:
+        DependencyCycleError: If the edge would close a cycle
+    """
+    cache = cache or graph_cache
+    version = bump_version(scope)
+
+    if db.session.get(TaskDependency, (task_id, blocked_by_id)) is not None:
+        db.session.rollback()
+        return False
+    if creates_cycle(task_id, blocked_by_id):
+        db.session.rollback()
+        raise DependencyCycleError(
+            f"Task {blocked_by_id} already depends on task {task_id}")
+
+    db.session.add(TaskDependency(task_id=task_id, blocked_by_id=blocked_by_id))
+    db.session.commit()
+    cache.dependency_added(scope, version, task_id, blocked_by_id)
+    return True
+
+
+def load_graph(scope):
+    """Build a TaskGraph for a personal or team list with two queries"""
+    graph = TaskGraph()
+
+    tasks = db.session.query(Task.id, Task.due_date, Task.status).filter(scope_filter(scope))
+    for task_id, due_date, status in tasks:
+        graph.set_task(task_id, due_date, status)
+
+    edges = (db.session.query(TaskDependency.task_id, TaskDependency.blocked_by_id)
+             .join(Task, Task.id == TaskDependency.task_id)
+             .filter(scope_filter(scope)))
+    for task_id, blocked_by_id in edges:
+        graph.blocks[blocked_by_id].add(task_id)
+        graph.blocked_by[task_id].add(blocked_by_id)
+
+    return graph
+
+
+class TaskGraphCache:
+    """
+    TaskGraph cache per list, kept up to date by the task routes.
+
+    Graphs are keyed by task_scope(): a user's personal list or a team's
+    shared list. Each graph remembers the graph_version it reflects.
+    Routes that change tasks or dependencies call the matching method with
+    the version their write produced, so the cached graph is edited in
+    place instead of being reloaded. A graph that missed a write, e.g. one
+    made by another worker process, is reloaded by get() once the stored
+    version has moved on. The least recently used graphs are dropped once
+    `max_graphs` is reached.
+    """
+
+    def __init__(self, max_graphs=256):
+        self.max_graphs = max_graphs
+        self._graphs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scope):
+        """Return the current graph for a scope, (re)loading it if needed"""
+        version = graph_version(scope)
+
+        with self._lock:
+            graph = self._graphs.get(scope)
+            if graph is not None and graph.version == version:
+                self._graphs.move_to_end(scope)
+                return graph
+
+        # Version is read first: a write committed meanwhile makes the
+        # graph newer than its version and only causes an extra reload
+        graph = load_graph(scope)
+        graph.version = version
+
+        with self._lock:
+            cached = self._graphs.get(scope)
+            if cached is None or cached.version is None or cached.version < version:
+                self._graphs[scope] = graph
+                self._graphs.move_to_end(scope)
+            while len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+        return graph
+
+    def _cached(self, scope):
+        with self._lock:
+            return self._graphs.get(scope)
+
+    def _apply(self, scope, version, edit):
+        """
+        Apply an edit that moved a scope to `version`.
+
+        Only a graph at the version right before it can be edited in place;
+        any other graph missed a write and is dropped.
+        """
+        graph = self._cached(scope)
+        if graph is None:
+            return
+
+        with graph.lock:
+            if graph.version == version - 1:
+                try:
+                    edit(graph)
+                except DependencyCycleError:
+                    pass
+                else:
+                    graph.version = version
+                    return
+        self.invalidate(scope)
+
+    def task_saved(self, task, version):
+        """Call after a task is created or edited"""
+        self._apply(task_scope(task), version,
+                    lambda graph: graph.set_task(task.id, task.due_date, task.status))
+
+    def task_deleted(self, scope, version, task_id):
+        """Call after a task is deleted or moved off the scope's list"""
+        self._apply(scope, version, lambda graph: graph.remove_task(task_id))
+
+    def dependency_added(self, scope, version, task_id, blocked_by_id):
+        """Call after a dependency row is committed"""
+        self._apply(scope, version, lambda graph: graph.add_edge(task_id, blocked_by_id))
+
+    def dependency_removed(self, scope, version, task_id, blocked_by_id):
+        """Call after a dependency row is deleted"""
+        self._apply(scope, version, lambda graph: graph.remove_edge(task_id, blocked_by_id))
+
+    def invalidate(self, scope=None):
+        """Drop one scope's graph, or all graphs"""
+        with self._lock:
+            if scope is None:
+                self._graphs.clear()
+            else:
+                self._graphs.pop(scope, None)
+
+
+graph_cache = TaskGraphCache()
@@ -0,0 +1,173 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text, select, table, column
+import online_migrations
+from online_migrations import alembic_config, upgrade_database, batched_backfill, backfill_progress
+
+
+class MigrationsTestCase(unittest.TestCase):
+
+    """Create a fresh file-backed SQLite database for each test"""
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.engine = create_engine('sqlite:///' + self.db_path)
+
+    def tearDown(self):
+        """Dispose engine and remove database file"""
+        self.engine.dispose()
+        os.remove(self.db_path)
+
+    def create_tasks(self, count):
+        """Insert a user with the given number of tasks"""
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO user (id, username, email, password) "
+                "VALUES (1, 'user', 'user@example.com', 'x')"))
+            for i in range(count):
+                connection.execute(text(
+                    "INSERT INTO task (title, status, due_date, priority, user_id) "
+                    "VALUES (:title, 'To Do', '2030-01-01', 'Low', 1)"),
+                    {'title': f'Task {i}'})
+
+    # Test 1: Upgrade on an empty database
+    def test_upgrade_creates_schema(self):
+        """Test upgrading an empty database creates tables and indexes"""
+        upgrade_database(self.engine)
+
+        inspector = inspect(self.engine)
+        self.assertIn('user', inspector.get_table_names())
+        self.assertIn('task', inspector.get_table_names())
+
+        index_names = {index['name'] for index in inspector.get_indexes('task')}
+        self.assertIn('ix_task_user_id_status', index_names)
+        self.assertIn('ix_task_due_date', index_names)
+
+    # Test 2: Upgrade on a database created by create_all()
+    def test_upgrade_stamps_legacy_database(self):
+        """Test a pre-migrations database keeps its data when upgraded"""
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(80) NOT NULL UNIQUE, "
+                "email VARCHAR(25) NOT NULL UNIQUE, password VARCHAR(255))"))
+            connection.execute(text(
+                "CREATE TABLE task (id INTEGER PRIMARY KEY, title VARCHAR(100) NOT NULL, "
+                "description VARCHAR(500), status VARCHAR(12) NOT NULL, due_date DATE NOT NULL, "
+                "priority VARCHAR(8) NOT NULL, user_id INTEGER NOT NULL REFERENCES user (id))"))
+        self.create_tasks(2)
+
+        upgrade_database(self.engine)
+
+        with self.engine.connect() as connection:
+            version = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+            count = connection.execute(text("SELECT COUNT(*) FROM task")).scalar()
+            slot = connection.execute(text("SELECT reminder_slot FROM user")).scalar()
+
+        head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+        self.assertEqual(version, head)
+        self.assertEqual(count, 2)
+        # Existing users are backfilled into the 09:xx reminder slots
+        self.assertIn(slot, range(36, 40))
+
+    # Test 3: Backfill resumes after an interruption
+    def test_batched_backfill_resumes(self):
+        """Test an interrupted backfill continues from its checkpoint"""
+        upgrade_database(self.engine)
+        self.create_tasks(25)
+
+        tasks = table('task', column('id'), column('priority'))
+        calls = []
+
+        def interrupt(name, rows_done, total, last_id):
+            calls.append(rows_done)
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            batched_backfill(self.engine, tasks, {'priority': 'High'},
+                             where=tasks.c.priority == 'Low', name='priority',
+                             batch_size=10, pause=0, progress=interrupt)
+        self.assertEqual(calls, [10])
+
+        rows_done = batched_backfill(self.engine, tasks, {'priority': 'High'},
+                                     where=tasks.c.priority == 'Low', name='priority',
+                                     batch_size=10, pause=0, progress=None)
+        self.assertEqual(rows_done, 25)
+
+        with self.engine.connect() as connection:
+            remaining = connection.execute(
+                text("SELECT COUNT(*) FROM task WHERE priority = 'Low'")).scalar()
+            finished = connection.execute(
+                select(backfill_progress.c.finished)).scalar()
+
+        self.assertEqual(remaining, 0)
+        self.assertTrue(finished)
+
+    # Test 4: Autocommit blocks inside migrations run by upgrade_database()
+    def test_autocommit_block_under_upgrade_database(self):
+        """Test batched_backfill and concurrent index creation in an autocommit block"""
+        upgrade_database(self.engine)
+        self.create_tasks(12)
+
+        head = ScriptDirectory.from_config(online_migrations.alembic_config()).get_current_head()
+        extra_versions = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, extra_versions)
+        with open(os.path.join(extra_versions, 'test_autocommit.py'), 'w') as f:
+            f.write(AUTOCOMMIT_REVISION.format(head=head))
+
+        original_config = online_migrations.alembic_config
+
+        def config_with_extra_versions(connection=None):
+            config = original_config(connection)
+            versions = os.path.join(online_migrations.basedir, 'migrations', 'versions')
+            config.set_main_option('path_separator', 'os')
+            config.set_main_option('version_locations', os.pathsep.join([versions, extra_versions]))
+            return config
+
+        # Take the PostgreSQL path so create_index_online() uses autocommit_block()
+        with patch.object(online_migrations, 'alembic_config', config_with_extra_versions), \
+                patch.object(online_migrations, 'supports_concurrent_index', return_value=True):
+            upgrade_database(self.engine)
+
+        with self.engine.connect() as connection:
+            version = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+            remaining = connection.execute(
+                text("SELECT COUNT(*) FROM task WHERE priority = 'Low'")).scalar()
+
+        self.assertEqual(version, 'test_autocommit')
+        self.assertEqual(remaining, 0)
+        index_names = {index['name'] for index in inspect(self.engine).get_indexes('task')}
+        self.assertIn('ix_task_test_priority', index_names)
+
+
+# Revision exercising autocommit blocks, chained onto the current head
+AUTOCOMMIT_REVISION = '''
+from alembic import op
+import sqlalchemy as sa
+from online_migrations import batched_backfill, create_index_online
+
+revision = 'test_autocommit'
+down_revision = '{head}'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tasks = sa.table('task', sa.column('id', sa.Integer), sa.column('priority', sa.String))
+    with op.get_context().autocommit_block():
+        batched_backfill(op.get_bind(), tasks, {{'priority': 'High'}},
+                         where=tasks.c.priority == 'Low', name='test_autocommit',
+                         batch_size=5, pause=0, progress=None)
+    create_index_online('ix_task_test_priority', 'task', ['priority'])
+
+
+def downgrade():
+    pass
+'''
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+from datetime import date, datetime, time, timedelta, timezone
+from unittest.mock import patch
+import app as app_module
+from app import app
+from database import db, User, Task
+from reminders import local_slots, parse_offsets, bucket_start
+from werkzeug.security import generate_password_hash
+
+
+class ReminderHelpersTestCase(unittest.TestCase):
+
+    """Unit tests for reminder slot and offset helpers"""
+
+    # Test 1: Slots follow the local clock
+    def test_local_slots(self):
+        """Test a UTC bucket maps to the local date and slot of a timezone"""
+        now = datetime(2026, 6, 1, 0, 0, tzinfo=timezone.utc)
+
+        self.assertEqual(local_slots(now, 'UTC'), (date(2026, 6, 1), [0]))
+        # Tokyo is UTC+9, so 00:00 UTC is 09:00 local (slot 36)
+        self.assertEqual(local_slots(now, 'Asia/Tokyo'), (date(2026, 6, 1), [36]))
+        # New York is UTC-4 in summer, so still the previous day
+        self.assertEqual(local_slots(now, 'America/New_York'), (date(2026, 5, 31), [80]))
+
+    # Test 2: Daylight saving transitions
+    def test_local_slots_dst(self):
+        """Test skipped slots are covered and repeated slots are skipped"""
+        # Europe/Sofia jumps from 03:00 to 04:00 on 2026-03-29 (01:00 UTC)
+        spring = datetime(2026, 3, 29, 1, 0, tzinfo=timezone.utc)
+        self.assertEqual(local_slots(spring, 'Europe/Sofia')[1], [12, 13, 14, 15, 16])
+
+        # Clocks go back from 04:00 to 03:00 on 2026-10-25 (01:00 UTC)
+        autumn = datetime(2026, 10, 25, 1, 15, tzinfo=timezone.utc)
+        self.assertEqual(local_slots(autumn, 'Europe/Sofia')[1], [])
+
+    # Test 3: Offset parsing
+    def test_parse_offsets(self):
+        """Test offsets are de-duplicated, sorted and validated"""
+        self.assertEqual(parse_offsets(' 1,3,0,3'), [3, 1, 0])
+        with self.assertRaises(ValueError):
+            parse_offsets('7,abc')
+        with self.assertRaises(ValueError):
+            parse_offsets('45')
+
+    # Test 4: Bucket start
+    def test_bucket_start(self):
+        """Test times are rounded down to the 15 minute bucket"""
+        now = datetime(2026, 6, 1, 10, 29, 59, tzinfo=timezone.utc)
+        self.assertEqual(bucket_start(now), datetime(2026, 6, 1, 10, 15, tzinfo=timezone.utc))
+
+
+class ReminderSchedulingTestCase(unittest.TestCase):
+
+    """Set up test client, database and users in two timezones"""
+    def setUp(self):
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        app.config['WTF_CSRF_ENABLED'] = False
+        app.config['SECRET_KEY'] = 'test-key'
+
+        self.client = app.test_client()
+        self.today = date(2026, 6, 1)
+
+        with app.app_context():
+            db.create_all()
+            tokyo = User(username='tokyo', email='tokyo@example.com',
+                         password=generate_password_hash('Password123'),
+                         timezone='Asia/Tokyo', reminder_offsets='2', reminder_slot=36)
+            london = User(username='london', email='london@example.com',
+                          password=generate_password_hash('Password123'),
+                          timezone='Europe/London', reminder_offsets='3,1,0', reminder_slot=36)
+            db.session.add_all([tokyo, london])
+            db.session.commit()
+
+            for user in (tokyo, london):
+                for days in range(4):
+                    db.session.add(Task(title=f'{user.username} {days}', status='To Do',
+                                        priority='Low', user_id=user.id,
+                                        due_date=self.today + timedelta(days=days)))
+            db.session.commit()
+
+    def tearDown(self):
+        """Clean up database after each test"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def run_bucket(self, hour, day=0):
+        """Process buckets up to the given UTC hour and return sent subjects"""
+        now = datetime.combine(self.today + timedelta(days=day), time(hour), tzinfo=timezone.utc)
+        with patch.object(app_module, 'send_email') as send_email:
+            app_module.check_and_send_email(now)
+        return sorted((call.args[2], call.args[0]) for call in send_email.call_args_list)
+
+    # Test 5: Only the matching timezone bucket is processed
+    def test_bucket_selects_local_send_time(self):
+        """Test each user is reminded at 09:00 local time with their own offsets"""
+        # 00:00 UTC is 09:00 in Tokyo
+        self.assertEqual(self.run_bucket(0), [('tokyo@example.com', '2 days left')])
+
+        # 08:00 UTC is 09:00 in London (BST)
+        self.assertEqual(self.run_bucket(8), [
+            ('london@example.com', '1 day left'),
+            ('london@example.com', '3 days left'),
+            ('london@example.com', 'Deadline Today'),
+        ])
+
+        self.assertEqual(self.run_bucket(12), [])
+
+    # Test 6: Missed buckets are caught up
+    def test_missed_buckets_caught_up(self):
+        """Test a run after skipped buckets sends their reminders exactly once"""
+        self.assertEqual(self.run_bucket(0), [('tokyo@example.com', '2 days left')])
+
+        # Runs between 00:15 and 08:45 UTC were skipped; London's 08:00 bucket is caught up
+        self.assertEqual(len(self.run_bucket(9)), 3)
+
+        # Buckets already processed are not sent again
+        self.assertEqual(self.run_bucket(9), [])
+        self.assertEqual(self.run_bucket(8), [])
+
+    # Test 7: Catch-up stops at the local midnight
+    def test_catch_up_skips_previous_local_day(self):
+        """Test buckets of a local day that is over are not sent with stale wording"""
+        self.assertEqual(self.run_bucket(0), [('tokyo@example.com', '2 days left')])
+
+        # The next run is a day later: London's 09:00 yesterday is skipped,
+        # Tokyo's 09:00 today is sent with offsets counted from today
+        self.assertEqual(self.run_bucket(7, day=1), [('tokyo@example.com', '2 days left')])
+
+    # Test 8: Settings route
+    def test_settings_update(self):
+        """Test saving reminder settings normalises offsets and moves the slot"""
+        self.client.post('/login', data={'username': 'london', 'password': 'Password123'})
+
+        response = self.client.post('/settings', data={
+            'timezone': 'America/New_York',
+            'reminder_hour': 18,
+            'reminder_offsets': '0, 7,1'
+        })
+        self.assertEqual(response.status_code, 302)
+
+        with app.app_context():
+            user = User.query.filter_by(username='london').first()
+            self.assertEqual(user.timezone, 'America/New_York')
+            self.assertEqual(user.reminder_offsets, '7,1,0')
+            self.assertEqual(user.reminder_slot // 4, 18)
+
+        response = self.client.post('/settings', data={
+            'timezone': 'Not/AZone',
+            'reminder_hour': 18,
+            'reminder_offsets': '1'
+        })
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,253 @@
+import os
+import tempfile
+import unittest
+import time
+from unittest.mock import patch
+from app import app
+from database import db, User
+from sessions import (SQLiteSessionStore, RedisSessionStore, ServerSideSessionInterface,
+                      SESSION_ID_PATTERN, new_session_id)
+from werkzeug.security import generate_password_hash
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class SessionStoreTestCase(unittest.TestCase):
+
+    """Unit tests for the SQLite session store"""
+    def setUp(self):
+        self.store = SQLiteSessionStore(':memory:', lru_size=2)
+
+    # Test 1: Save, load and delete
+    def test_save_load_delete(self):
+        """Test a saved session can be loaded until it is deleted"""
+        sid = new_session_id()
+        self.store.save(sid, '{"a": 1}', '7', time.time() + 60)
+
+        self.assertEqual(self.store.load(sid)[0], '{"a": 1}')
+        self.store.delete(sid)
+        self.assertIsNone(self.store.load(sid))
+
+    # Test 2: Expired sessions are swept in batches
+    def test_sweep_expired(self):
+        """Test expired sessions are not loaded and are removed by the sweep"""
+        expired = [new_session_id() for _ in range(5)]
+        for sid in expired:
+            self.store.save(sid, '{}', None, time.time() - 1)
+        live = new_session_id()
+        self.store.save(live, '{}', None, time.time() + 60)
+
+        self.assertIsNone(self.store.load(expired[0]))
+        self.assertEqual(self.store.sweep_expired(batch_size=2), 5)
+        self.assertIsNotNone(self.store.load(live))
+
+    # Test 3: Revoking all sessions of a user
+    def test_revoke_user(self):
+        """Test revoke_user removes only that user's sessions, cached or not"""
+        sids = [new_session_id() for _ in range(3)]
+        for sid in sids:
+            self.store.save(sid, '{}', '1', time.time() + 60)
+        other = new_session_id()
+        self.store.save(other, '{}', '2', time.time() + 60)
+
+        self.assertEqual(self.store.revoke_user(1), 3)
+        self.assertTrue(all(self.store.load(sid) is None for sid in sids))
+        self.assertIsNotNone(self.store.load(other))
+
+    # Test 4: Revoked sessions are not written back
+    def test_save_after_revoke_from_other_store(self):
+        """Test a save from another process cannot bring a revoked session back"""
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        worker_a, worker_b = SQLiteSessionStore(path), SQLiteSessionStore(path)
+
+        sid = new_session_id()
+        worker_a.save(sid, '{}', '1', time.time() + 60)
+        self.assertIsNotNone(worker_b.load(sid))
+
+        worker_a.revoke_user(1)
+        # Worker B's request loaded the session before the revoke
+        self.assertFalse(worker_b.save(sid, '{"_flashes": []}', '1', time.time() + 60, create=False))
+
+        self.assertIsNone(worker_a.load(sid))
+        self.assertIsNone(worker_b.load(sid))
+
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+class RedisSessionStoreTestCase(unittest.TestCase):
+
+    """Unit tests for the Redis session store using fakeredis"""
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.store = RedisSessionStore(fakeredis.FakeRedis(server=self.server))
+
+    # Test 5: Sessions are shared between nodes
+    def test_shared_between_nodes(self):
+        """Test a session revoked on one node is gone on another"""
+        other_node = RedisSessionStore(fakeredis.FakeRedis(server=self.server))
+        sid = new_session_id()
+        self.store.save(sid, '{"_user_id": "1"}', '1', time.time() + 60)
+
+        self.assertEqual(other_node.load(sid)[0], '{"_user_id": "1"}')
+        self.assertEqual(other_node.revoke_user(1), 1)
+        self.assertIsNone(self.store.load(sid))
+
+    # Test 6: Sessions saved while revoking stay revocable
+    def test_revoke_user_concurrent_save(self):
+        """Test a session saved during revoke_user is kept in the user's set"""
+        old, new = new_session_id(), new_session_id()
+        self.store.save(old, '{}', '1', time.time() + 60)
+
+        smembers = self.store.client.smembers
+
+        def save_after_read(key):
+            members = smembers(key)
+            self.store.save(new, '{}', '1', time.time() + 60)
+            return members
+
+        with patch.object(self.store.client, 'smembers', side_effect=save_after_read):
+            self.assertEqual(self.store.revoke_user(1), 1)
+
+        self.assertIsNone(self.store.load(old))
+        self.assertTrue(self.store.client.sismember(self.store._user_key(1), new))
+        self.assertEqual(self.store.revoke_user(1), 1)
+        self.assertIsNone(self.store.load(new))
+
+    # Test 7: Revoked sessions are not written back
+    def test_save_after_revoke(self):
+        """Test saving an existing session after it was revoked does not recreate it"""
+        sid = new_session_id()
+        self.store.save(sid, '{}', '1', time.time() + 60)
+        RedisSessionStore(fakeredis.FakeRedis(server=self.server)).revoke_user(1)
+
+        self.assertFalse(self.store.save(sid, '{}', '1', time.time() + 60, create=False))
+        self.assertIsNone(self.store.load(sid))
+        self.assertEqual(self.store.client.scard(self.store._user_key(1)), 0)
+
+    # Test 8: Sweep prunes per-user sets
+    def test_sweep_prunes_user_sets(self):
+        """Test ids of expired sessions are removed from the user's set"""
+        sids = [new_session_id() for _ in range(3)]
+        for sid in sids:
+            self.store.save(sid, '{}', '1', time.time() + 60)
+        self.store.client.delete(self.store._key(sids[0]))
+
+        self.assertEqual(self.store.sweep_expired(batch_size=1), 1)
+        self.assertEqual(self.store.client.scard(self.store._user_key(1)), 2)
+
+
+class ServerSideSessionTestCase(unittest.TestCase):
+
+    """Set up test client, database, a user and an in-memory session store"""
+    def setUp(self):
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        app.config['WTF_CSRF_ENABLED'] = False
+        app.config['SECRET_KEY'] = 'test-key'
+
+        self.original_interface = app.session_interface
+        app.session_interface = ServerSideSessionInterface(SQLiteSessionStore(':memory:'))
+
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(username='sessionuser', email='session@example.com',
+                                password=generate_password_hash('Password123')))
+            db.session.commit()
+
+    def tearDown(self):
+        """Restore session interface and clean up database"""
+        app.session_interface = self.original_interface
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def login(self, client):
+        """Log the client in and return its session cookie value"""
+        client.post('/login', data={'username': 'sessionuser', 'password': 'Password123'})
+        return client.get_cookie('session').value
+
+    # Test 9: Cookie only carries the session id
+    def test_cookie_holds_session_id(self):
+        """Test the session cookie is a bare id and the session works"""
+        client = app.test_client()
+        sid = self.login(client)
+
+        self.assertRegex(sid, SESSION_ID_PATTERN)
+        self.assertEqual(client.get('/dashboard').status_code, 200)
+
+    # Test 10: Session id changes on login
+    def test_login_regenerates_session_id(self):
+        """Test the pre-login session id is discarded after login"""
+        client = app.test_client()
+        client.post('/login', data={'username': 'sessionuser', 'password': 'wrong-password'})
+        before = client.get_cookie('session').value
+
+        after = self.login(client)
+
+        self.assertNotEqual(before, after)
+        self.assertIsNone(app.session_interface.store.load(before))
+
+    # Test 11: Anonymous sessions expire quickly
+    def test_anonymous_sessions_expire_quickly(self):
+        """Test sessions without a logged in user get a short store lifetime"""
+        client = app.test_client()
+        store = app.session_interface.store
+
+        # A failed login flashes a message, which stores an anonymous session
+        client.post('/login', data={'username': 'sessionuser', 'password': 'wrong-password'})
+        _, expires_at = store.load(client.get_cookie('session').value)
+        self.assertAlmostEqual(expires_at - time.time(), 3600, delta=60)
+
+        sid = self.login(client)
+        _, expires_at = store.load(sid)
+        self.assertAlmostEqual(expires_at - time.time(), 86400, delta=60)
+
+    # Test 12: Logging out on all devices
+    def test_logout_all_revokes_other_sessions(self):
+        """Test logout_all signs the user out of every client"""
+        laptop, phone = app.test_client(), app.test_client()
+        self.login(laptop)
+        self.login(phone)
+
+        # A GET link (e.g. embedded by another site) does nothing
+        self.assertEqual(laptop.get('/logout_all').status_code, 405)
+        self.assertEqual(phone.get('/dashboard').status_code, 200)
+
+        # So does a POST without the CSRF token
+        app.config['WTF_CSRF_ENABLED'] = True
+        try:
+            laptop.post('/logout_all')
+        finally:
+            app.config['WTF_CSRF_ENABLED'] = False
+        self.assertEqual(phone.get('/dashboard').status_code, 200)
+
+        laptop.post('/logout_all')
+
+        response = phone.get('/dashboard', follow_redirects=False)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/login', response.location)
+
+
+    # Test 13: Requests in flight during a revoke
+    def test_in_flight_request_cannot_restore_revoked_session(self):
+        """Test a request that loaded the session before logout_all does not write it back"""
+        client = app.test_client()
+        sid = self.login(client)
+        store = app.session_interface.store
+        record = store.load(sid)
+        store.revoke_user(1)
+
+        # The request loaded the session before the revoke and then flashes
+        with patch.object(store, 'load', return_value=record):
+            client.get('/tasks/9999/edit')
+
+        self.assertIsNone(client.get_cookie('session'))
+        self.assertIsNone(store.load(sid))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,227 @@
+import sys
+import threading
+import unittest
+from datetime import date, timedelta
+from app import app
+from database import db, User, Task, TaskDependency
+from task_graph import TaskGraph, TaskGraphCache, DependencyCycleError, graph_cache, add_dependency
+from werkzeug.security import generate_password_hash
+
+
+class TaskGraphTestCase(unittest.TestCase):
+
+    """Unit tests for the in-memory dependency graph"""
+    def setUp(self):
+        self.graph = TaskGraph()
+        today = date.today()
+        for task_id in range(1, 6):
+            self.graph.set_task(task_id, today + timedelta(days=task_id), 'To Do')
+
+    # Test 1: Topological order respects dependencies
+    def test_topological_order(self):
+        """Test every task comes after its blockers"""
+        self.graph.add_edge(1, 3)
+        self.graph.add_edge(3, 5)
+        self.graph.add_edge(2, 5)
+
+        order = self.graph.topological_order()
+        self.assertEqual(len(order), 5)
+        self.assertLess(order.index(5), order.index(3))
+        self.assertLess(order.index(3), order.index(1))
+        self.assertLess(order.index(5), order.index(2))
+
+    # Test 2: Cycles are rejected
+    def test_cycle_rejected(self):
+        """Test adding an edge that closes a cycle raises an error"""
+        self.graph.add_edge(1, 2)
+        self.graph.add_edge(2, 3)
+
+        with self.assertRaises(DependencyCycleError):
+            self.graph.add_edge(3, 1)
+        with self.assertRaises(DependencyCycleError):
+            self.graph.add_edge(4, 4)
+
+    # Test 3: Critical path follows due dates
+    def test_critical_path(self):
+        """Test the critical path ends at the latest due date, not the longest chain"""
+        self.graph.add_edge(2, 1)
+        self.graph.add_edge(3, 2)
+        self.graph.add_edge(5, 4)
+
+        # The two task chain due last beats the longer one due earlier
+        self.assertEqual(self.graph.critical_path(), [4, 5])
+
+        # Walks back through the blocker with the least slack
+        self.graph.add_edge(5, 3)
+        self.graph.set_task(4, date.today(), 'To Do')
+        self.assertEqual(self.graph.critical_path(), [1, 2, 3, 5])
+
+        # Removing a task invalidates the cached path
+        self.graph.remove_task(2)
+        self.assertEqual(self.graph.critical_path(), [3, 5])
+
+    # Test 4: Blocked status follows blocker completion
+    def test_blocked_status(self):
+        """Test a task is unblocked once its blockers are completed"""
+        self.graph.add_edge(1, 2)
+        self.assertTrue(self.graph.is_blocked(1))
+
+        self.graph.set_task(2, date.today(), 'Completed')
+        self.assertFalse(self.graph.is_blocked(1))
+
+    # Test 5: Large chains stay iterative
+    def test_large_graph(self):
+        """Test a long dependency chain is handled without recursion"""
+        graph = TaskGraph()
+        for task_id in range(20000):
+            graph.set_task(task_id, date.today(), 'To Do')
+            if task_id:
+                graph.add_edge(task_id, task_id - 1)
+
+        self.assertEqual(graph.topological_order()[:3], [0, 1, 2])
+        self.assertEqual(len(graph.critical_path()), 20000)
+
+    # Test 6: Concurrent edits and traversals
+    def test_concurrent_edits_and_reads(self):
+        """Test traversals running while another thread edits the graph"""
+        graph = TaskGraph()
+        for task_id in range(200):
+            graph.set_task(task_id, date.today(), 'To Do')
+        errors = []
+
+        def edit():
+            for _ in range(50):
+                for task_id in range(1, 200):
+                    graph.add_edge(task_id, task_id - 1)
+                for task_id in range(100, 200):
+                    graph.remove_task(task_id)
+                for task_id in range(100, 200):
+                    graph.set_task(task_id, date.today(), 'To Do')
+
+        def read():
+            try:
+                while editor.is_alive():
+                    graph.topological_order()
+                    graph.critical_path()
+                    graph.blocked_status()
+            except Exception as error:
+                errors.append(error)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            editor = threading.Thread(target=edit)
+            readers = [threading.Thread(target=read) for _ in range(2)]
+            editor.start()
+            for reader in readers:
+                reader.start()
+            editor.join()
+            for reader in readers:
+                reader.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(errors, [])
+        # Cached results match the final graph: chain 0..99, then 100..199 unlinked
+        self.assertEqual(graph.topological_order(), list(range(200)))
+        self.assertEqual(graph.critical_path(), list(range(100)))
+
+
+class TaskDependencyApiTestCase(unittest.TestCase):
+
+    """Set up test client, database and a logged in user with three tasks"""
+    def setUp(self):
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        app.config['WTF_CSRF_ENABLED'] = False
+        app.config['SECRET_KEY'] = 'test-key'
+
+        self.client = app.test_client()
+        graph_cache.invalidate()
+
+        with app.app_context():
+            db.create_all()
+            user = User(username='graphuser', email='graph@example.com',
+                        password=generate_password_hash('Password123'))
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+
+            self.task_ids = []
+            for i in range(3):
+                task = Task(title=f'Task {i}', due_date=date.today() + timedelta(days=i),
+                            status='To Do', priority='Low', user_id=user.id)
+                db.session.add(task)
+                db.session.commit()
+                self.task_ids.append(task.id)
+
+        self.client.post('/login', data={'username': 'graphuser', 'password': 'Password123'})
+
+    def tearDown(self):
+        """Clean up database and cached graphs after each test"""
+        graph_cache.invalidate()
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    # Test 7: Dependency endpoints
+    def test_dependency_endpoints(self):
+        """Test adding dependencies and reading order, path and status"""
+        first, second, third = self.task_ids
+
+        # JSON booleans are not task ids
+        response = self.client.post(f'/api/tasks/{third}/dependencies', json={'blocked_by_id': True})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(f'/api/tasks/{third}/dependencies', json={'blocked_by_id': second})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(f'/api/tasks/{second}/dependencies', json={'blocked_by_id': first})
+        self.assertEqual(response.status_code, 201)
+
+        # Closing the cycle is rejected
+        response = self.client.post(f'/api/tasks/{first}/dependencies', json={'blocked_by_id': third})
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(self.client.get('/api/tasks/order').json['order'], [first, second, third])
+
+        path = self.client.get('/api/tasks/critical_path').json['critical_path']
+        self.assertEqual([task['id'] for task in path], [first, second, third])
+        self.assertEqual([task['slack_days'] for task in path], [1, 1, None])
+
+        status = self.client.get('/api/tasks/blocked').json
+        self.assertEqual(status['unblocked'], [first])
+        self.assertEqual(sorted(status['blocked']), [second, third])
+
+    # Test 8: Deleting a task removes its edges
+    def test_delete_task_removes_dependencies(self):
+        """Test deleting a blocker unblocks its dependents"""
+        first, second, _ = self.task_ids
+        self.client.post(f'/api/tasks/{second}/dependencies', json={'blocked_by_id': first})
+        self.assertIn(second, self.client.get('/api/tasks/blocked').json['blocked'])
+
+        self.client.delete(f'/api/tasks/{first}/delete')
+
+        self.assertIn(second, self.client.get('/api/tasks/blocked').json['unblocked'])
+        with app.app_context():
+            self.assertEqual(TaskDependency.query.count(), 0)
+
+    # Test 9: Edges committed by another worker are not missed
+    def test_edge_added_through_other_cache(self):
+        """Test a stale cached graph cannot let a cycle through"""
+        first, second, third = self.task_ids
+        self.assertEqual(self.client.get('/api/tasks/order').json['order'], [first, second, third])
+
+        # Another worker process has its own cache
+        with app.app_context():
+            add_dependency(('user', self.user_id), first, third, cache=TaskGraphCache())
+
+        response = self.client.post(f'/api/tasks/{third}/dependencies', json={'blocked_by_id': first})
+        self.assertEqual(response.status_code, 400)
+        with app.app_context():
+            self.assertEqual(TaskDependency.query.count(), 1)
+
+        self.assertEqual(self.client.get('/api/tasks/order').json['order'], [second, third, first])
+
+
+if __name__ == '__main__':
+    unittest.main()
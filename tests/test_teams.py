@@ -0,0 +1,224 @@
+import unittest
+from datetime import date, datetime, time, timedelta, timezone
+from unittest.mock import patch
+from sqlalchemy import event
+import app as app_module
+from app import app
+from database import db, User, Task, TeamMembership
+from werkzeug.security import generate_password_hash
+
+
+class TeamsTestCase(unittest.TestCase):
+
+    """Set up test client, database and three users"""
+    def setUp(self):
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        app.config['WTF_CSRF_ENABLED'] = False
+        app.config['SECRET_KEY'] = 'test-key'
+
+        self.client = app.test_client()
+
+        with app.app_context():
+            db.create_all()
+            for name in ('owner', 'member', 'outsider'):
+                db.session.add(User(username=name, email=f'{name}@example.com',
+                                    password=generate_password_hash('Password123')))
+            db.session.commit()
+
+    def tearDown(self):
+        """Clean up database after each test"""
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def login(self, username):
+        """Log in as the given user"""
+        self.client.get('/logout')
+        self.client.post('/login', data={'username': username, 'password': 'Password123'})
+
+    def create_shared_task(self, title='Shared Task', days=3):
+        """Create a team owned by `owner` with `member`, and one task on its list"""
+        self.login('owner')
+        team_id = self.client.post('/api/teams', json={'name': 'Project'}).json['id']
+        self.client.post(f'/api/teams/{team_id}/members', json={'username': 'member'})
+        self.client.post('/create_task', data={
+            'title': title,
+            'description': 'On the shared list',
+            'due_date': str(date.today() + timedelta(days=days)),
+            'status': 'To Do',
+            'priority': 'High',
+            'team_id': team_id
+        })
+        with app.app_context():
+            task_id = Task.query.filter_by(title=title).first().id
+        return team_id, task_id
+
+    # Test 1: Members see and edit shared tasks
+    def test_member_sees_shared_task(self):
+        """Test a team member can view, export and edit a shared task"""
+        team_id, task_id = self.create_shared_task()
+
+        self.login('member')
+        response = self.client.get('/dashboard')
+        self.assertIn(b'Shared Task', response.data)
+        self.assertIn(b'Project', self.client.get('/download_csv').data)
+
+        self.client.post(f'/tasks/{task_id}/edit', data={
+            'title': 'Edited by member',
+            'description': '',
+            'due_date': str(date.today() + timedelta(days=5)),
+            'status': 'In Progress',
+            'priority': 'High',
+            'team_id': team_id
+        })
+        with app.app_context():
+            self.assertEqual(db.session.get(Task, task_id).title, 'Edited by member')
+
+    # Test 2: Non-members cannot see shared tasks
+    def test_outsider_cannot_access_shared_task(self):
+        """Test a user outside the team cannot view or delete the task"""
+        team_id, task_id = self.create_shared_task()
+
+        self.login('outsider')
+        self.assertNotIn(b'Shared Task', self.client.get('/dashboard').data)
+        self.assertEqual(self.client.delete(f'/api/tasks/{task_id}/delete').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/tasks/order?team_id={team_id}').status_code, 404)
+
+    # Test 3: Only owners manage members
+    def test_only_owner_adds_members(self):
+        """Test a regular member cannot add users to the team"""
+        team_id, _ = self.create_shared_task()
+
+        self.login('member')
+        response = self.client.post(f'/api/teams/{team_id}/members', json={'username': 'outsider'})
+        self.assertEqual(response.status_code, 404)
+
+        with app.app_context():
+            self.assertEqual(TeamMembership.query.filter_by(team_id=team_id).count(), 2)
+
+    # Test 4: Reminders go to every team member
+    def test_reminders_sent_to_team_members(self):
+        """Test the reminder scan emails all members of a shared list"""
+        self.create_shared_task(days=1)
+        with app.app_context():
+            User.query.update({'reminder_slot': 36})
+            db.session.commit()
+
+        # Slot 36 is 09:00-09:15 local time, users default to UTC
+        now = datetime.combine(date.today(), time(9), tzinfo=timezone.utc)
+        with patch.object(app_module, 'send_email') as send_email:
+            app_module.check_and_send_email(now)
+
+        recipients = sorted(call.args[2] for call in send_email.call_args_list)
+        self.assertEqual(recipients, ['member@example.com', 'owner@example.com'])
+
+    # Test 5: Dashboard query count does not grow with tasks
+    def test_dashboard_has_no_n_plus_one(self):
+        """Test dashboard issues the same number of queries for 1 and 20 shared tasks"""
+        team_id, _ = self.create_shared_task()
+        self.login('member')
+
+        def count_queries():
+            statements = []
+
+            def record(*args):
+                statements.append(args)
+
+            with app.app_context():
+                engine = db.engine
+            event.listen(engine, 'before_cursor_execute', record)
+            try:
+                self.client.get('/dashboard')
+            finally:
+                event.remove(engine, 'before_cursor_execute', record)
+            return len(statements)
+
+        single = count_queries()
+
+        with app.app_context():
+            user_id = User.query.filter_by(username='owner').first().id
+            for i in range(19):
+                db.session.add(Task(title=f'Extra {i}', due_date=date.today(), status='To Do',
+                                    priority='Low', user_id=user_id, team_id=team_id))
+            db.session.commit()
+
+        self.assertEqual(count_queries(), single)
+
+    # Test 6: Moving a shared task off the team list
+    def test_move_shared_task_to_personal_list(self):
+        """Test only the creator or an owner can move a task, onto their own list"""
+        team_id, task_id = self.create_shared_task()
+
+        def move_to_personal(task_id):
+            self.client.post(f'/tasks/{task_id}/edit', data={
+                'title': 'Moved',
+                'description': '',
+                'due_date': str(date.today() + timedelta(days=3)),
+                'status': 'To Do',
+                'priority': 'High',
+                'team_id': 0
+            })
+
+        # A regular member cannot pull the owner's task off the list
+        self.login('member')
+        move_to_personal(task_id)
+        with app.app_context():
+            self.assertEqual(db.session.get(Task, task_id).team_id, team_id)
+
+        # The owner can move a member's task, onto the owner's own list
+        self.client.post('/create_task', data={
+            'title': 'Member Task',
+            'description': '',
+            'due_date': str(date.today() + timedelta(days=3)),
+            'status': 'To Do',
+            'priority': 'Low',
+            'team_id': team_id
+        })
+        with app.app_context():
+            member_task_id = Task.query.filter_by(title='Member Task').first().id
+
+        self.login('owner')
+        move_to_personal(member_task_id)
+        with app.app_context():
+            task = db.session.get(Task, member_task_id)
+            owner_id = User.query.filter_by(username='owner').first().id
+            self.assertIsNone(task.team_id)
+            self.assertEqual(task.user_id, owner_id)
+
+    # Test 7: Teams always keep an owner
+    def test_last_owner_cannot_leave(self):
+        """Test the only owner cannot remove themselves, while members can leave"""
+        team_id, _ = self.create_shared_task()
+        with app.app_context():
+            owner_id = User.query.filter_by(username='owner').first().id
+            member_id = User.query.filter_by(username='member').first().id
+
+        response = self.client.delete(f'/api/teams/{team_id}/members/{owner_id}')
+        self.assertEqual(response.status_code, 400)
+
+        self.login('member')
+        response = self.client.delete(f'/api/teams/{team_id}/members/{member_id}')
+        self.assertEqual(response.status_code, 200)
+
+        with app.app_context():
+            membership = db.session.get(TeamMembership, (team_id, owner_id))
+            self.assertEqual(membership.role, 'owner')
+
+
+    # Test 8: Only the creator or an owner deletes team tasks
+    def test_member_cannot_delete_others_task(self):
+        """Test a regular member cannot delete the owner's task from the team list"""
+        _, task_id = self.create_shared_task()
+
+        self.login('member')
+        self.assertEqual(self.client.delete(f'/api/tasks/{task_id}/delete').status_code, 403)
+        with app.app_context():
+            self.assertIsNotNone(db.session.get(Task, task_id))
+
+        self.login('owner')
+        self.assertEqual(self.client.delete(f'/api/tasks/{task_id}/delete').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()